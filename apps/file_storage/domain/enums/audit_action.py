@@ -0,0 +1,6 @@
+from enum import Enum
+
+class AuditAction(str, Enum):
+    VIEW = "VIEW"
+    DOWNLOAD = "DOWNLOAD"
+    DELETE = "DELETE"
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class StorageTier(str, Enum):
+    HOT = "HOT"
+    COLD = "COLD"
\ No newline at end of file
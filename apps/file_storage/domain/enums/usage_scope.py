@@ -0,0 +1,5 @@
+from enum import Enum
+
+class UsageScope(str, Enum):
+    USER = "USER"
+    DEPARTMENT = "DEPARTMENT"
\ No newline at end of file
@@ -16,4 +16,13 @@ class FileAccessDenied(FileException):
     pass
 
 class FileUploadFailed(FileException):
-    pass
\ No newline at end of file
+    pass
+
+class QuotaExceeded(FileException):
+    pass
+
+class FileVersionNotFound(FileException):
+    pass
+
+class FileVersionConflict(FileException):
+    pass
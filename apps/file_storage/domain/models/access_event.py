@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from datetime import datetime
+from ..enums.audit_action import AuditAction
+
+@dataclass(slots=True)
+class AccessEvent:
+    occurred_at: datetime
+    user_id: int
+    file_id: int
+    action: AuditAction
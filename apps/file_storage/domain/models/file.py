@@ -2,8 +2,9 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Any, Optional
 from ..enums.file_visibility import FileVisibility
+from ..enums.storage_tier import StorageTier
 
-@dataclass
+@dataclass(slots=True)
 class File:
     id: int
     filename: str
@@ -16,4 +17,9 @@ class File:
     department: str
     download_count: int
     created_at: datetime
-    file_metadata: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    file_metadata: Optional[Dict[str, Any]] = None
+    codec: Optional[str] = None
+    storage_tier: StorageTier = StorageTier.HOT
+    storage_shard: str = "default"
+    last_accessed_at: Optional[datetime] = None
+    missing_at: Optional[datetime] = None
\ No newline at end of file
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from ..enums.usage_scope import UsageScope
+
+@dataclass(slots=True)
+class StorageUsage:
+    scope: UsageScope
+    scope_id: str
+    content_type: str
+    bytes: int
+    file_count: int
\ No newline at end of file
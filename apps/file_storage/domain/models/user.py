@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional
 from ..enums.user_role import UserRole
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: int
     username: str
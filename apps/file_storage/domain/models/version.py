@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+@dataclass(slots=True)
+class FileVersion:
+    id: int
+    file_id: int
+    version: int
+    size: int
+    original_filename: str
+    content_hash: str
+    chunk_count: int
+    new_chunks: int
+    new_bytes: int
+    created_by: int
+    created_at: datetime
+
+
+@dataclass(slots=True)
+class FileChunk:
+    hash: str
+    size: int
+    stored_size: int
+    codec: Optional[str]
+    storage_shard: str
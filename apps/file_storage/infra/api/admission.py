@@ -0,0 +1,55 @@
+import re
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from .deps import get_uow, check_rate_limit
+from ...service.auth_service import AuthService
+from ...domain.exceptions.auth import InvalidCredentials, UserNotFound
+from shared.throttling.governor import governor
+
+
+class UploadAdmissionMiddleware:
+    # FastAPI разбирает multipart до зависимостей, поэтому лимиты загрузок проверяются здесь, до чтения тела
+    UPLOAD_PATHS = re.compile(r"/files/(upload|\d+/versions)")
+
+    def __init__(self, app, prefix: str = ""):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not self._is_upload(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            user = await self._authenticate(scope)
+            # Эндпоинт возьмёт пользователя из request.state, не обращаясь к кэшу и БД повторно
+            scope.setdefault("state", {})["user"] = user
+            await check_rate_limit("upload", user.role.value, f"user:{user.id}")
+            await governor.acquire("upload")
+        except HTTPException as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await governor.release("upload")
+
+    def _is_upload(self, path: str) -> bool:
+        return path.startswith(self.prefix) and self.UPLOAD_PATHS.fullmatch(path[len(self.prefix):]) is not None
+
+    async def _authenticate(self, scope):
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+        try:
+            return await AuthService(get_uow()).get_current_user(token.strip())
+        except (InvalidCredentials, UserNotFound) as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=str(e),
+                headers={"WWW-Authenticate": "Bearer"},
+            )
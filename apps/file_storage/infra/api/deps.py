@@ -1,10 +1,21 @@
-from fastapi import Depends, HTTPException, status
+import ipaddress
+from functools import lru_cache
+from typing import List, Union
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from shared.db.connection import AsyncSessionLocal
-from ..db.uow import FileStorageUoW
+from shared.db.connection import AsyncSessionLocal, read_router
+from shared.exceptions.http import TooManyRequests
+from shared.throttling.rate_limiter import rate_limiter
+from config.settings import settings
+from ..db.uow import FileStorageUoW, FileStorageReadOnlyUoW
 from ...service.auth_service import AuthService
 from ...service.user_service import UserService
 from ...service.file_service import FileService
+from ...service.lifecycle_service import LifecycleService
+from ...service.rebalance_service import RebalanceService
+from ...service.usage_service import UsageService
+from ...service.audit_service import AuditService
+from ...service.notification_service import NotificationService
 from ...domain.models.user import User
 from ...domain.exceptions.auth import InvalidCredentials, UserNotFound
 
@@ -13,19 +24,42 @@ security = HTTPBearer()
 def get_uow() -> FileStorageUoW:
     return FileStorageUoW(AsyncSessionLocal)
 
-def get_auth_service(uow: FileStorageUoW = Depends(get_uow)) -> AuthService:
-    return AuthService(uow)
+def get_read_uow() -> FileStorageReadOnlyUoW:
+    return FileStorageReadOnlyUoW(read_router.session)
 
-def get_user_service(uow: FileStorageUoW = Depends(get_uow)) -> UserService:
-    return UserService(uow)
+def get_auth_service(uow: FileStorageUoW = Depends(get_uow), read_uow: FileStorageReadOnlyUoW = Depends(get_read_uow)) -> AuthService:
+    return AuthService(uow, read_uow)
 
-def get_file_service(uow: FileStorageUoW = Depends(get_uow)) -> FileService:
-    return FileService(uow)
+def get_user_service(uow: FileStorageUoW = Depends(get_uow), read_uow: FileStorageReadOnlyUoW = Depends(get_read_uow)) -> UserService:
+    return UserService(uow, read_uow)
+
+def get_file_service(uow: FileStorageUoW = Depends(get_uow), read_uow: FileStorageReadOnlyUoW = Depends(get_read_uow)) -> FileService:
+    return FileService(uow, read_uow)
+
+def get_lifecycle_service(uow: FileStorageUoW = Depends(get_uow)) -> LifecycleService:
+    return LifecycleService(uow)
+
+def get_rebalance_service(uow: FileStorageUoW = Depends(get_uow)) -> RebalanceService:
+    return RebalanceService(uow)
+
+def get_usage_service(uow: FileStorageReadOnlyUoW = Depends(get_read_uow)) -> UsageService:
+    return UsageService(uow)
+
+def get_audit_service(uow: FileStorageReadOnlyUoW = Depends(get_read_uow)) -> AuditService:
+    return AuditService(uow)
+
+def get_notification_service() -> NotificationService:
+    return NotificationService()
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     auth_service: AuthService = Depends(get_auth_service)
 ) -> User:
+    # Загрузки уже аутентифицированы UploadAdmissionMiddleware
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
     try:
         return await auth_service.get_current_user(credentials.credentials)
     except (InvalidCredentials, UserNotFound) as e:
@@ -33,4 +67,51 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+
+
+async def check_rate_limit(endpoint_class: str, role: str, identity: str) -> None:
+    limit = settings.rate_limits.get(role, {}).get(endpoint_class)
+    if not settings.rate_limit_enabled or not limit:
+        return
+
+    retry_after = await rate_limiter.hit(f"{endpoint_class}:{identity}", limit["per_minute"], int(limit["burst"]))
+    if retry_after > 0:
+        raise TooManyRequests(retry_after)
+
+
+def rate_limit(endpoint_class: str):
+    async def dependency(current_user: User = Depends(get_current_user)) -> None:
+        await check_rate_limit(endpoint_class, current_user.role.value, f"user:{current_user.id}")
+    return dependency
+
+
+async def check_anonymous_rate_limit(endpoint_class: str, request: Request, username: str) -> None:
+    # Имя пользователя входит в ключ: за NAT или прокси общий адрес не должен блокировать вход всем сразу
+    await check_rate_limit(endpoint_class, "ANONYMOUS", f"ip:{client_ip(request)}:user:{username}")
+
+
+def client_ip(request: Request) -> str:
+    # За доверенным прокси клиент — ближайший справа адрес X-Forwarded-For, не принадлежащий прокси
+    host = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(host):
+        return host
+
+    forwarded = [address.strip() for address in request.headers.get("x-forwarded-for", "").split(",") if address.strip()]
+    for address in reversed(forwarded):
+        if not _is_trusted_proxy(address):
+            return address
+    return forwarded[0] if forwarded else host
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_networks())
+
+
+@lru_cache
+def _trusted_networks() -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    return [ipaddress.ip_network(proxy, strict=False) for proxy in settings.trusted_proxies]
\ No newline at end of file
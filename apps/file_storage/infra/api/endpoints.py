@@ -1,21 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File as FileUpload, Form, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, UploadFile, File as FileUpload, Form, status
 from fastapi.responses import StreamingResponse
-from typing import List
-from .deps import get_auth_service, get_user_service, get_file_service, get_current_user
-from .requests import LoginRequest, CreateUserRequest, UpdateUserRoleRequest
+import json
+from datetime import datetime
+from typing import List, Optional
+from .deps import get_auth_service, get_user_service, get_file_service, get_lifecycle_service, get_rebalance_service, get_usage_service, get_audit_service, get_notification_service, get_current_user, rate_limit, check_anonymous_rate_limit
+from .requests import LoginRequest, CreateUserRequest, UpdateUserRoleRequest, BatchGetFilesRequest
 from .responses import *
 from ...service.auth_service import AuthService
 from ...service.user_service import UserService
 from ...service.file_service import FileService
+from ...service.lifecycle_service import LifecycleService
+from ...service.rebalance_service import RebalanceService
+from ...service.usage_service import UsageService
+from ...service.audit_service import AuditService
+from ...service.notification_service import NotificationService
 from ...domain.models.user import User
 from ...domain.enums.file_visibility import FileVisibility
+from ...domain.enums.audit_action import AuditAction
 from ...domain.exceptions.auth import InvalidCredentials, UserNotFound, InsufficientPermissions, UserAlreadyExists
 from ...domain.exceptions.file import *
+from shared.throttling.governor import governor
 
 router = APIRouter()
 
 @router.post("/auth/login", response_model=TokenResponse, tags=["Authentication"])
-async def login(request: LoginRequest, auth_service: AuthService = Depends(get_auth_service)):
+async def login(request: LoginRequest, http_request: Request, auth_service: AuthService = Depends(get_auth_service)):
+    await check_anonymous_rate_limit("login", http_request, request.username)
     try:
         token = await auth_service.login(request.username, request.password)
         return TokenResponse(access_token=token)
@@ -78,12 +88,19 @@ async def upload_file(file: UploadFile = FileUpload(...), visibility: FileVisibi
             owner_id=uploaded_file.owner_id, department=uploaded_file.department, download_count=uploaded_file.download_count,
             file_metadata=uploaded_file.file_metadata, created_at=uploaded_file.created_at
         )
-    except (FileTypeNotAllowed, FileSizeExceeded, FileAccessDenied, FileUploadFailed) as e:
+    except (FileTypeNotAllowed, FileSizeExceeded, FileAccessDenied, FileUploadFailed, QuotaExceeded) as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/files", response_model=FileListResponse, tags=["Files"])
-async def list_files(current_user: User = Depends(get_current_user), file_service: FileService = Depends(get_file_service)):
-    files = await file_service.get_accessible_files(current_user)
+async def list_files(response: Response, include_metadata: bool = False, if_none_match: Optional[str] = Header(None),
+                     current_user: User = Depends(get_current_user), file_service: FileService = Depends(get_file_service)):
+    etag = await file_service.get_listing_etag(current_user, include_metadata)
+    if etag and if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    files = await file_service.get_accessible_files(current_user, include_metadata, tagged=etag is not None)
+    if etag:
+        response.headers["ETag"] = etag
     file_responses = [FileResponse(
         id=file.id, filename=file.filename, original_filename=file.original_filename, size=file.size,
         content_type=file.content_type, visibility=file.visibility, owner_id=file.owner_id,
@@ -92,10 +109,38 @@ async def list_files(current_user: User = Depends(get_current_user), file_servic
     ) for file in files]
     return FileListResponse(files=file_responses, count=len(file_responses))
 
+@router.post("/files/batch-get", response_model=BatchGetFilesResponse, tags=["Files"])
+async def batch_get_files(request: BatchGetFilesRequest, current_user: User = Depends(get_current_user),
+                          file_service: FileService = Depends(get_file_service)):
+    files, forbidden, missing = await file_service.get_files_batch(request.ids, current_user)
+    file_responses = [FileResponse(
+        id=file.id, filename=file.filename, original_filename=file.original_filename, size=file.size,
+        content_type=file.content_type, visibility=file.visibility, owner_id=file.owner_id,
+        department=file.department, download_count=file.download_count, file_metadata=file.file_metadata,
+        created_at=file.created_at
+    ) for file in files]
+    return BatchGetFilesResponse(files=file_responses, forbidden=forbidden, missing=missing)
+
+@router.get("/files/events", tags=["Files"])
+async def stream_file_events(current_user: User = Depends(get_current_user),
+                             notification_service: NotificationService = Depends(get_notification_service)):
+    async def event_stream():
+        async for event in notification_service.stream(current_user):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/files/{file_id}", response_model=FileResponse, tags=["Files"])
 async def get_file(file_id: int, current_user: User = Depends(get_current_user), file_service: FileService = Depends(get_file_service)):
     try:
-        file = await file_service.get_file_by_id(file_id, current_user)
+        file = await file_service.view_file(file_id, current_user)
         return FileResponse(
             id=file.id, filename=file.filename, original_filename=file.original_filename, size=file.size,
             content_type=file.content_type, visibility=file.visibility, owner_id=file.owner_id,
@@ -108,25 +153,104 @@ async def get_file(file_id: int, current_user: User = Depends(get_current_user),
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
 
-@router.get("/files/{file_id}/download", tags=["Files"])
+@router.get("/files/{file_id}/download", tags=["Files"], dependencies=[Depends(rate_limit("download"))])
 async def download_file(file_id: int, current_user: User = Depends(get_current_user),
-                        file_service: FileService = Depends(get_file_service)):
+                        file_service: FileService = Depends(get_file_service),
+                        accept_encoding: Optional[str] = Header(None)):
     try:
-        file_stream, file = await file_service.download_file(file_id, current_user)
+        accepted_encodings = {
+            encoding.split(";")[0].strip().lower()
+            for encoding in (accept_encoding or "").split(",")
+            if encoding.strip() and not encoding.replace(" ", "").endswith(";q=0")
+        }
+        await governor.acquire("download")
+        try:
+            file_stream, file, content_encoding = await file_service.download_file(file_id, current_user, accepted_encodings)
+        except Exception:
+            await governor.release("download")
+            raise
 
         safe_filename = file.original_filename.encode('ascii', 'ignore').decode('ascii')
         if not safe_filename:
             safe_filename = f"file_{file.id}"
 
+        headers = {"Content-Disposition": f"attachment; filename={safe_filename}"}
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+            headers["Vary"] = "Accept-Encoding"
+
         return StreamingResponse(
-            file_stream,
+            governor.release_after("download", file_stream),
             media_type=file.content_type,
-            headers={"Content-Disposition": f"attachment; filename={safe_filename}"}
+            headers=headers
+        )
+    except FileNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except FileAccessDenied as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+
+@router.post("/files/{file_id}/versions", response_model=FileVersionResponse, tags=["Files"])
+async def create_file_version(file_id: int, file: UploadFile = FileUpload(...), current_user: User = Depends(get_current_user),
+                              file_service: FileService = Depends(get_file_service)):
+    try:
+        version = await file_service.create_version(file_id, file, current_user)
+        return FileVersionResponse(
+            version=version.version, size=version.size, original_filename=version.original_filename,
+            content_hash=version.content_hash, chunk_count=version.chunk_count, new_chunks=version.new_chunks,
+            new_bytes=version.new_bytes, created_by=version.created_by, created_at=version.created_at
         )
     except FileNotFound as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except FileAccessDenied as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except FileVersionConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except (FileTypeNotAllowed, FileSizeExceeded, FileUploadFailed, QuotaExceeded) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/files/{file_id}/versions", response_model=FileVersionListResponse, tags=["Files"])
+async def list_file_versions(file_id: int, current_user: User = Depends(get_current_user),
+                             file_service: FileService = Depends(get_file_service)):
+    try:
+        versions = await file_service.get_versions(file_id, current_user)
+        version_responses = [FileVersionResponse(
+            version=version.version, size=version.size, original_filename=version.original_filename,
+            content_hash=version.content_hash, chunk_count=version.chunk_count, new_chunks=version.new_chunks,
+            new_bytes=version.new_bytes, created_by=version.created_by, created_at=version.created_at
+        ) for version in versions]
+        return FileVersionListResponse(versions=version_responses, count=len(version_responses))
+    except FileNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except FileAccessDenied as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+
+@router.get("/files/{file_id}/versions/{version}/download", tags=["Files"], dependencies=[Depends(rate_limit("download"))])
+async def download_file_version(file_id: int, version: int, current_user: User = Depends(get_current_user),
+                                file_service: FileService = Depends(get_file_service)):
+    try:
+        await governor.acquire("download")
+        try:
+            file_stream, file, file_version = await file_service.download_version(file_id, version, current_user)
+        except Exception:
+            await governor.release("download")
+            raise
+
+        safe_filename = file_version.original_filename.encode('ascii', 'ignore').decode('ascii')
+        if not safe_filename:
+            safe_filename = f"file_{file.id}_v{file_version.version}"
+
+        return StreamingResponse(
+            governor.release_after("download", file_stream),
+            media_type=file.content_type,
+            headers={
+                "Content-Disposition": f"attachment; filename={safe_filename}",
+                "Content-Length": str(file_version.size)
+            }
+        )
+    except (FileNotFound, FileVersionNotFound) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except FileAccessDenied as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
 @router.delete("/files/{file_id}", response_model=MessageResponse, tags=["Files"])
 async def delete_file(file_id: int, current_user: User = Depends(get_current_user), file_service: FileService = Depends(get_file_service)):
@@ -136,4 +260,60 @@ async def delete_file(file_id: int, current_user: User = Depends(get_current_use
     except FileNotFound as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except FileAccessDenied as e:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+
+@router.get("/storage/compression", response_model=CompressionStatsResponse, tags=["Storage"])
+async def get_compression_stats(current_user: User = Depends(get_current_user), file_service: FileService = Depends(get_file_service)):
+    try:
+        stats = file_service.get_compression_stats(current_user)
+        return CompressionStatsResponse(content_types=[CompressionStatResponse(**item) for item in stats])
+    except InsufficientPermissions as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+
+@router.get("/storage/lifecycle/report", response_model=LifecycleReportResponse, tags=["Storage"])
+async def get_lifecycle_report(current_user: User = Depends(get_current_user), lifecycle_service: LifecycleService = Depends(get_lifecycle_service)):
+    try:
+        report = await lifecycle_service.get_report(current_user)
+        return LifecycleReportResponse(
+            dry_run=report["dry_run"], files=report["files"], bytes=report["bytes"],
+            departments={name: LifecycleScopeResponse(**scope) for name, scope in report["departments"].items()}
+        )
+    except InsufficientPermissions as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+
+@router.get("/storage/rebalance/report", response_model=RebalanceReportResponse, tags=["Storage"])
+async def get_rebalance_report(current_user: User = Depends(get_current_user), rebalance_service: RebalanceService = Depends(get_rebalance_service)):
+    try:
+        report = await rebalance_service.get_report(current_user)
+        return RebalanceReportResponse(
+            dry_run=report["dry_run"], files_scanned=report["files_scanned"], files=report["files"],
+            bytes=report["bytes"], chunks_scanned=report.get("chunks_scanned", 0), chunks=report.get("chunks", 0),
+            chunk_bytes=report.get("chunk_bytes", 0), failed=report["failed"],
+            shards={name: RebalanceShardResponse(**shard) for name, shard in report["shards"].items()},
+            finished_at=report.get("finished_at")
+        )
+    except InsufficientPermissions as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+
+@router.get("/usage", response_model=UsageResponse, tags=["Usage"])
+async def get_usage(user_id: Optional[int] = None, department: Optional[str] = None,
+                    current_user: User = Depends(get_current_user), usage_service: UsageService = Depends(get_usage_service)):
+    try:
+        usage = await usage_service.get_usage(current_user, user_id, department)
+        return UsageResponse(**usage)
+    except InsufficientPermissions as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+
+@router.get("/audit/events", response_model=AccessEventListResponse, tags=["Audit"])
+async def get_audit_events(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                           user_id: Optional[int] = None, file_id: Optional[int] = None,
+                           action: Optional[AuditAction] = None, limit: int = 100,
+                           current_user: User = Depends(get_current_user), audit_service: AuditService = Depends(get_audit_service)):
+    try:
+        events = await audit_service.get_events(current_user, since, until, user_id, file_id, action, limit)
+        event_responses = [AccessEventResponse(
+            occurred_at=event.occurred_at, user_id=event.user_id, file_id=event.file_id, action=event.action
+        ) for event in events]
+        return AccessEventListResponse(events=event_responses, count=len(event_responses))
+    except InsufficientPermissions as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
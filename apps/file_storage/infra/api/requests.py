@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import List
+from pydantic import BaseModel, Field
 from ...domain.enums.user_role import UserRole
 from ...domain.enums.file_visibility import FileVisibility
 
@@ -16,4 +17,7 @@ class UpdateUserRoleRequest(BaseModel):
     role: UserRole
 
 class FileUploadRequest(BaseModel):
-    visibility: FileVisibility
\ No newline at end of file
+    visibility: FileVisibility
+
+class BatchGetFilesRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
@@ -3,6 +3,8 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List
 from ...domain.enums.user_role import UserRole
 from ...domain.enums.file_visibility import FileVisibility
+from ...domain.enums.usage_scope import UsageScope
+from ...domain.enums.audit_action import AuditAction
 
 
 class TokenResponse(BaseModel):
@@ -47,6 +49,105 @@ class FileListResponse(BaseModel):
     count: int
 
 
+class BatchGetFilesResponse(BaseModel):
+    files: List[FileResponse]
+    forbidden: List[int]
+    missing: List[int]
+
+
+class FileVersionResponse(BaseModel):
+    version: int
+    size: int
+    original_filename: str
+    content_hash: str
+    chunk_count: int
+    new_chunks: int
+    new_bytes: int
+    created_by: int
+    created_at: datetime
+
+
+class FileVersionListResponse(BaseModel):
+    versions: List[FileVersionResponse]
+    count: int
+
+
 class UserListResponse(BaseModel):
     users: List[UserResponse]
-    count: int
\ No newline at end of file
+    count: int
+
+
+class CompressionStatResponse(BaseModel):
+    content_type: str
+    files: int
+    compressed_files: int
+    original_bytes: int
+    stored_bytes: int
+    ratio: float
+    cpu_seconds: float
+
+
+class CompressionStatsResponse(BaseModel):
+    content_types: List[CompressionStatResponse]
+
+
+class LifecycleScopeResponse(BaseModel):
+    files: int
+    bytes: int
+
+
+class LifecycleReportResponse(BaseModel):
+    dry_run: bool
+    files: int
+    bytes: int
+    departments: Dict[str, LifecycleScopeResponse]
+
+
+class RebalanceShardResponse(BaseModel):
+    files: int
+    bytes: int
+
+
+class RebalanceReportResponse(BaseModel):
+    dry_run: bool
+    files_scanned: int
+    files: int
+    bytes: int
+    chunks_scanned: int = 0
+    chunks: int = 0
+    chunk_bytes: int = 0
+    failed: int
+    shards: Dict[str, RebalanceShardResponse]
+    finished_at: Optional[datetime] = None
+
+
+class ContentTypeUsageResponse(BaseModel):
+    content_type: str
+    bytes: int
+    file_count: int
+
+
+class ScopeUsageResponse(BaseModel):
+    scope: UsageScope
+    scope_id: str
+    bytes: int
+    file_count: int
+    quota_bytes: Optional[int]
+    content_types: List[ContentTypeUsageResponse]
+
+
+class UsageResponse(BaseModel):
+    user: Optional[ScopeUsageResponse] = None
+    department: Optional[ScopeUsageResponse] = None
+
+
+class AccessEventResponse(BaseModel):
+    occurred_at: datetime
+    user_id: int
+    file_id: int
+    action: AuditAction
+
+
+class AccessEventListResponse(BaseModel):
+    events: List[AccessEventResponse]
+    count: int
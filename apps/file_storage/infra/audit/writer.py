@@ -0,0 +1,95 @@
+import asyncio
+from contextlib import suppress
+from datetime import date, datetime, timezone
+from typing import List, Optional, Set
+from shared.db.connection import AsyncSessionLocal
+from shared.metrics.registry import AUDIT_EVENTS
+from config.settings import settings
+from ..db.repositories import AuditRepository
+from ...domain.models.access_event import AccessEvent
+from ...domain.enums.audit_action import AuditAction
+
+
+class AuditWriter:
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+        self._partitions: Set[date] = set()
+
+    def record(self, user_id: int, file_id: int, action: AuditAction) -> None:
+        # Никогда не ждёт: при переполнении очереди событие отбрасывается и учитывается в метрике
+        if not settings.audit_enabled:
+            return
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue(maxsize=settings.audit_queue_size)
+            self._task = asyncio.create_task(self._run())
+
+        event = AccessEvent(occurred_at=datetime.now(timezone.utc), user_id=user_id, file_id=file_id, action=action)
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            AUDIT_EVENTS.labels("dropped").inc()
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        # Пачка, которую цикл успел отдать на запись, дописывается до остановки
+        if self._flushing is not None:
+            await self._flushing
+            self._flushing = None
+        await self._flush(self._drain())
+
+    async def _run(self) -> None:
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = asyncio.get_running_loop().time() + settings.audit_flush_interval
+                # asyncio.timeout_at, а не wait_for: в 3.11 wait_for теряет отмену, пришедшую вместе с событием,
+                # и close() ждал бы остановки цикла вечно
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        while len(batch) < settings.audit_batch_size:
+                            batch.append(await self._queue.get())
+                except TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                # Отмена при остановке не должна терять уже собранную пачку: её дождётся close()
+                self._start_flush(batch)
+                raise
+            await asyncio.shield(self._start_flush(batch))
+
+    def _start_flush(self, batch: List[AccessEvent]) -> asyncio.Task:
+        self._flushing = asyncio.create_task(self._flush(batch))
+        return self._flushing
+
+    def _drain(self) -> List[AccessEvent]:
+        batch = []
+        while self._queue is not None and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: List[AccessEvent]) -> None:
+        if not batch:
+            return
+        try:
+            async with AsyncSessionLocal() as session:
+                repo = AuditRepository(session)
+                months = {event.occurred_at.date().replace(day=1) for event in batch} - self._partitions
+                await repo.ensure_partitions(sorted(months))
+                await repo.add_many(batch)
+                await session.commit()
+            self._partitions.update(months)
+            AUDIT_EVENTS.labels("written").inc(len(batch))
+        except Exception as e:
+            print(f"Audit flush failed: {e}")
+            AUDIT_EVENTS.labels("dropped").inc(len(batch))
+
+
+audit_writer = AuditWriter()
@@ -0,0 +1,27 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from redis.exceptions import RedisError
+from shared.storage.redis_client import redis_client, sync_redis_client
+
+
+class ReportCache:
+    PREFIX = "maintenance-report:"
+
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            payload = await redis_client.get(self.PREFIX + name)
+        except RedisError:
+            return None
+        return json.loads(payload) if payload else None
+
+    def set_sync(self, name: str, report: Dict[str, Any]) -> None:
+        # Пишется из задач Celery, поэтому через синхронный клиент
+        payload = json.dumps({**report, "finished_at": datetime.now(timezone.utc).isoformat()})
+        try:
+            sync_redis_client.set(self.PREFIX + name, payload)
+        except RedisError:
+            pass
+
+
+report_cache = ReportCache()
@@ -0,0 +1,52 @@
+import json
+from datetime import datetime
+from typing import Optional
+from redis.exceptions import RedisError
+from shared.storage.redis_client import redis_client
+from config.settings import settings
+from ...domain.models.user import User
+from ...domain.enums.user_role import UserRole
+
+
+class UserCache:
+    PREFIX = "auth-user:"
+
+    async def get(self, username: str) -> Optional[User]:
+        try:
+            payload = await redis_client.get(self.PREFIX + username)
+        except RedisError:
+            return None
+        if not payload:
+            return None
+
+        data = json.loads(payload)
+        return User(
+            id=data["id"],
+            username=data["username"],
+            role=UserRole(data["role"]),
+            department=data["department"],
+            created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None
+        )
+
+    async def set(self, user: User) -> None:
+        # Хэш пароля в кэш не попадает
+        payload = json.dumps({
+            "id": user.id,
+            "username": user.username,
+            "role": user.role.value,
+            "department": user.department,
+            "created_at": user.created_at.isoformat() if user.created_at else None
+        })
+        try:
+            await redis_client.set(self.PREFIX + user.username, payload, ex=settings.auth_cache_ttl)
+        except RedisError:
+            pass
+
+    async def invalidate(self, username: str) -> None:
+        try:
+            await redis_client.delete(self.PREFIX + username)
+        except RedisError:
+            pass
+
+
+user_cache = UserCache()
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, JSON, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from shared.db.base import Base
 from ...domain.enums.user_role import UserRole
 from ...domain.enums.file_visibility import FileVisibility
+from ...domain.enums.storage_tier import StorageTier
+from ...domain.enums.usage_scope import UsageScope
 
 
 class UserModel(Base):
@@ -29,10 +31,100 @@ class FileModel(Base):
     content_type = Column(String(100), nullable=False)
     visibility = Column(Enum(FileVisibility), nullable=False)
     s3_path = Column(String(500), nullable=False)
+    codec = Column(String(20), nullable=True)
+    storage_tier = Column(Enum(StorageTier), nullable=False, default=StorageTier.HOT, server_default=StorageTier.HOT.value)
+    storage_shard = Column(String(50), nullable=False, default="default", server_default="default")
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     department = Column(String(100), nullable=False)
     download_count = Column(Integer, default=0)
     file_metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_accessed_at = Column(DateTime(timezone=True), nullable=True)
+    missing_at = Column(DateTime(timezone=True), nullable=True)
 
-    owner = relationship("UserModel", back_populates="files")
\ No newline at end of file
+    owner = relationship("UserModel", back_populates="files")
+
+    __table_args__ = (
+        # Выражение совпадает с условием отбора кандидатов lifecycle (_cold_conditions)
+        Index("ix_files_tier_last_access", storage_tier, func.coalesce(last_accessed_at, created_at), id),
+        # Сверка сливает пути с листингом S3 в побайтовом порядке; в SQLite нет сопоставления "C", там хватает BINARY
+        Index("ix_files_shard_s3_path", storage_shard, s3_path.collate("C")).ddl_if(dialect="postgresql"),
+        Index("ix_files_shard_s3_path", storage_shard, s3_path).ddl_if(dialect="sqlite"),
+    )
+
+
+class StorageUsageModel(Base):
+    __tablename__ = "storage_usage"
+
+    scope = Column(Enum(UsageScope), primary_key=True)
+    scope_id = Column(String(100), primary_key=True)
+    content_type = Column(String(100), primary_key=True)
+    bytes = Column(BigInteger, nullable=False, default=0)
+    file_count = Column(Integer, nullable=False, default=0)
+
+
+class MetadataCacheModel(Base):
+    __tablename__ = "metadata_cache"
+
+    content_hash = Column(String(64), primary_key=True)
+    content_type = Column(String(100), primary_key=True)
+    extractor_version = Column(Integer, primary_key=True)
+    file_metadata = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class FileVersionModel(Base):
+    __tablename__ = "file_versions"
+    __table_args__ = (UniqueConstraint("file_id", "version", name="uq_file_versions_file_id_version"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(Integer, ForeignKey("files.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    original_filename = Column(String(255), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    chunk_count = Column(Integer, nullable=False)
+    new_chunks = Column(Integer, nullable=False, default=0)
+    new_bytes = Column(BigInteger, nullable=False, default=0)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class FileChunkModel(Base):
+    __tablename__ = "file_chunks"
+
+    # Чанк адресуется SHA-256 содержимого и хранится один раз, сколько бы версий на него ни ссылалось
+    hash = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    stored_size = Column(Integer, nullable=False)
+    codec = Column(String(20), nullable=True)
+    storage_shard = Column(String(50), nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class FileVersionChunkModel(Base):
+    __tablename__ = "file_version_chunks"
+
+    version_id = Column(Integer, ForeignKey("file_versions.id"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    chunk_hash = Column(String(64), nullable=False)
+
+
+class AccessEventModel(Base):
+    __tablename__ = "access_events"
+    # В PostgreSQL таблица секционирована по месяцам; секции создаёт AuditRepository.ensure_partitions
+    __table_args__ = (
+        Index("ix_access_events_occurred_at", "occurred_at"),
+        Index("ix_access_events_file_id", "file_id", "occurred_at"),
+        Index("ix_access_events_user_id", "user_id", "occurred_at"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"}
+    )
+
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    file_id = Column(Integer, nullable=False)
+    action = Column(String(20), nullable=False)
+
+    # Первичного ключа у журнала нет: ORM нужен лишь для маппинга, строки пишутся пачками через INSERT/COPY
+    __mapper_args__ = {"primary_key": [occurred_at, user_id, file_id, action]}
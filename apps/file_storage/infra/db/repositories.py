@@ -1,14 +1,30 @@
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from .models import UserModel, FileModel
+from sqlalchemy import select, update, delete, and_, or_, func, tuple_, true, null, text, bindparam
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from shared.metrics.db import instrumented
+from .models import (
+    UserModel, FileModel, StorageUsageModel, MetadataCacheModel, AccessEventModel,
+    FileVersionModel, FileChunkModel, FileVersionChunkModel
+)
 from ...domain.models.user import User
 from ...domain.models.file import File
+from ...domain.models.usage import StorageUsage
+from ...domain.models.access_event import AccessEvent
+from ...domain.models.version import FileVersion, FileChunk
 from ...domain.enums.user_role import UserRole
 from ...domain.enums.file_visibility import FileVisibility
+from ...domain.enums.storage_tier import StorageTier
+from ...domain.enums.usage_scope import UsageScope
+from ...domain.enums.audit_action import AuditAction
 
 
+@instrumented
 class UserRepository:
+    # Чтения выбирают только нужные колонки и не заводят ORM-объекты; хэш пароля нужен лишь при входе
+    COLUMNS = (UserModel.id, UserModel.username, UserModel.role, UserModel.department, UserModel.created_at)
 
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -26,23 +42,23 @@ class UserRepository:
         return self._to_domain(user_model)
 
     async def get_by_id(self, user_id: int) -> Optional[User]:
-        result = await self.session.execute(select(UserModel).where(UserModel.id == user_id))
-        user_model = result.scalar_one_or_none()
-        return self._to_domain(user_model) if user_model else None
-
-    async def get_by_username(self, username: str) -> Optional[User]:
-        result = await self.session.execute(select(UserModel).where(UserModel.username == username))
-        user_model = result.scalar_one_or_none()
+        result = await self.session.execute(select(*self.COLUMNS).where(UserModel.id == user_id))
+        row = result.first()
+        return User(**row._mapping) if row else None
 
-        return self._to_domain(user_model) if user_model else None
+    async def get_by_username(self, username: str, with_password: bool = False) -> Optional[User]:
+        columns = self.COLUMNS + (UserModel.hashed_password,) if with_password else self.COLUMNS
+        result = await self.session.execute(select(*columns).where(UserModel.username == username))
+        row = result.first()
+        return User(**row._mapping) if row else None
 
     async def get_by_department(self, department: str) -> List[User]:
-        result = await self.session.execute(select(UserModel).where(UserModel.department == department))
-        return [self._to_domain(model) for model in result.scalars().all()]
+        result = await self.session.execute(select(*self.COLUMNS).where(UserModel.department == department))
+        return [User(**row._mapping) for row in result]
 
     async def get_all(self) -> List[User]:
-        result = await self.session.execute(select(UserModel))
-        return [self._to_domain(model) for model in result.scalars().all()]
+        result = await self.session.execute(select(*self.COLUMNS))
+        return [User(**row._mapping) for row in result]
 
     async def update_role(self, user_id: int, role: UserRole) -> User:
         result = await self.session.execute(select(UserModel).where(UserModel.id == user_id))
@@ -63,14 +79,19 @@ class UserRepository:
         )
 
 
+@instrumented
 class FileRepository:
+    # Колонки таблицы совпадают с полями File; метаданные (JSON) выбираются только там, где они нужны
+    COLUMNS = tuple(column for column in FileModel.__table__.columns if column.key != "file_metadata")
+    COLUMNS_WITH_METADATA = COLUMNS + (FileModel.__table__.c.file_metadata,)
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create(self, filename: str, original_filename: str, size: int,
                      content_type: str, visibility: FileVisibility, s3_path: str,
-                     owner_id: int, department: str) -> File:
+                     owner_id: int, department: str, codec: Optional[str] = None,
+                     storage_shard: str = "default") -> File:
         file_model = FileModel(
             filename=filename,
             original_filename=original_filename,
@@ -79,7 +100,9 @@ class FileRepository:
             visibility=visibility,
             s3_path=s3_path,
             owner_id=owner_id,
-            department=department
+            department=department,
+            codec=codec,
+            storage_shard=storage_shard
         )
         self.session.add(file_model)
         await self.session.flush()
@@ -87,30 +110,51 @@ class FileRepository:
         return self._to_domain(file_model)
 
     async def get_by_id(self, file_id: int) -> Optional[File]:
-        result = await self.session.execute(select(FileModel).where(FileModel.id == file_id))
-        file_model = result.scalar_one_or_none()
-        return self._to_domain(file_model) if file_model else None
+        result = await self.session.execute(select(*self.COLUMNS_WITH_METADATA).where(FileModel.id == file_id))
+        row = result.first()
+        return File(**row._mapping) if row else None
+
+    async def get_accessible_files(self, user_id: int, user_role: UserRole, user_department: str,
+                                   include_metadata: bool = False) -> List[File]:
+        columns = self.COLUMNS_WITH_METADATA if include_metadata else self.COLUMNS
+        result = await self.session.execute(
+            select(*columns).where(self._access_condition(user_id, user_role, user_department))
+        )
+        return [File(**row._mapping) for row in result]
 
-    async def get_accessible_files(self, user_id: int, user_role: UserRole, user_department: str) -> List[File]:
-        conditions = []
+    async def get_many_with_access(self, file_ids: Sequence[int], user_id: int, user_role: UserRole,
+                                   user_department: str) -> Tuple[List[File], List[int]]:
+        # Права проверяются в том же запросе: доступные файлы и id запрещённых за один проход
+        accessible = self._access_condition(user_id, user_role, user_department).label("accessible")
+        result = await self.session.execute(
+            select(*self.COLUMNS_WITH_METADATA, accessible).where(FileModel.id.in_(file_ids))
+        )
+
+        files, forbidden = [], []
+        for row in result:
+            values = dict(row._mapping)
+            if values.pop("accessible"):
+                files.append(File(**values))
+            else:
+                forbidden.append(values["id"])
+        return files, forbidden
 
+    def _access_condition(self, user_id: int, user_role: UserRole, user_department: str):
         if user_role == UserRole.ADMIN:
-            conditions.append(True)
-        elif user_role == UserRole.MANAGER:
-            conditions.extend([
+            return true()
+
+        if user_role == UserRole.MANAGER:
+            return or_(
                 FileModel.visibility == FileVisibility.PUBLIC,
                 FileModel.visibility == FileVisibility.DEPARTMENT,
                 and_(FileModel.visibility == FileVisibility.PRIVATE, FileModel.owner_id == user_id)
-            ])
-        else:
-            conditions.extend([
-                FileModel.visibility == FileVisibility.PUBLIC,
-                and_(FileModel.visibility == FileVisibility.DEPARTMENT, FileModel.department == user_department),
-                and_(FileModel.visibility == FileVisibility.PRIVATE, FileModel.owner_id == user_id)
-            ])
+            )
 
-        result = await self.session.execute(select(FileModel).where(or_(*conditions)))
-        return [self._to_domain(model) for model in result.scalars().all()]
+        return or_(
+            FileModel.visibility == FileVisibility.PUBLIC,
+            and_(FileModel.visibility == FileVisibility.DEPARTMENT, FileModel.department == user_department),
+            and_(FileModel.visibility == FileVisibility.PRIVATE, FileModel.owner_id == user_id)
+        )
 
     async def update_metadata(self, file_id: int, metadata: dict) -> None:
         result = await self.session.execute(select(FileModel).where(FileModel.id == file_id))
@@ -124,14 +168,134 @@ class FileRepository:
         file_model = result.scalar_one_or_none()
         if file_model:
             file_model.download_count += 1
+            file_model.last_accessed_at = func.now()
             await self.session.flush()
 
-    async def delete(self, file_id: int) -> None:
+    async def get_cold_candidates(self, accessed_before: datetime, max_download_count: Optional[int],
+                                  limit: int, after_id: int = 0, department: Optional[str] = None,
+                                  exclude_departments: Sequence[str] = ()) -> List[File]:
+        conditions = self._cold_conditions(accessed_before, max_download_count, department, exclude_departments)
+        result = await self.session.execute(
+            select(*self.COLUMNS)
+            .where(and_(FileModel.id > after_id, *conditions))
+            .order_by(FileModel.id)
+            .limit(limit)
+        )
+        return [File(**row._mapping) for row in result]
+
+    async def count_cold_candidates(self, accessed_before: datetime, max_download_count: Optional[int],
+                                    department: Optional[str] = None,
+                                    exclude_departments: Sequence[str] = ()) -> Tuple[int, int]:
+        conditions = self._cold_conditions(accessed_before, max_download_count, department, exclude_departments)
+        result = await self.session.execute(
+            select(func.count(), func.coalesce(func.sum(FileModel.size), 0)).where(and_(*conditions))
+        )
+        files, size = result.one()
+        return files, int(size)
+
+    def _cold_conditions(self, accessed_before: datetime, max_download_count: Optional[int],
+                         department: Optional[str], exclude_departments: Sequence[str]) -> list:
+        conditions = [
+            FileModel.storage_tier == StorageTier.HOT,
+            func.coalesce(FileModel.last_accessed_at, FileModel.created_at) < accessed_before
+        ]
+        if max_download_count is not None:
+            conditions.append(FileModel.download_count <= max_download_count)
+        if department is not None:
+            conditions.append(FileModel.department == department)
+        if exclude_departments:
+            conditions.append(FileModel.department.notin_(exclude_departments))
+        return conditions
+
+    async def move_to_tier(self, file_id: int, old_s3_path: str, new_s3_path: str,
+                           tier: StorageTier, codec: Optional[str], shard: str) -> bool:
+        result = await self.session.execute(
+            update(FileModel)
+            .where(and_(FileModel.id == file_id, FileModel.s3_path == old_s3_path, FileModel.storage_shard == shard))
+            .values(s3_path=new_s3_path, storage_tier=tier, codec=codec)
+        )
+        return result.rowcount == 1
+
+    async def replace_content(self, file_id: int, old_s3_path: str, s3_path: str, size: int,
+                              codec: Optional[str], shard: str) -> Optional[File]:
+        # Условие по старому пути блокирует строку и отсекает параллельную версию или перенос между уровнями
+        result = await self.session.execute(
+            update(FileModel)
+            .where(and_(FileModel.id == file_id, FileModel.s3_path == old_s3_path))
+            .values(
+                filename=s3_path.rsplit("/", 1)[-1],
+                s3_path=s3_path,
+                size=size,
+                codec=codec,
+                storage_tier=StorageTier.HOT,
+                storage_shard=shard,
+                file_metadata=null(),
+                missing_at=None
+            )
+            .returning(*self.COLUMNS_WITH_METADATA)
+        )
+        row = result.first()
+        return File(**row._mapping) if row else None
+
+    async def get_page(self, after_id: int, limit: int) -> List[File]:
+        result = await self.session.execute(
+            select(*self.COLUMNS).where(FileModel.id > after_id).order_by(FileModel.id).limit(limit)
+        )
+        return [File(**row._mapping) for row in result]
+
+    async def move_to_shard(self, file_id: int, s3_path: str, tier: StorageTier, old_shard: str, new_shard: str) -> bool:
+        # Строка меняется, только если за время копирования файл не удалили и не перенесли между уровнями
+        result = await self.session.execute(
+            update(FileModel)
+            .where(and_(
+                FileModel.id == file_id,
+                FileModel.s3_path == s3_path,
+                FileModel.storage_tier == tier,
+                FileModel.storage_shard == old_shard
+            ))
+            .values(storage_shard=new_shard)
+        )
+        return result.rowcount == 1
+
+    async def get_s3_paths(self, tiers: Sequence[StorageTier], after: str, limit: int, shard: str) -> List[str]:
+        # Порядок должен совпадать с побайтовым порядком листинга S3
+        s3_path = FileModel.s3_path
+        if self.session.bind.dialect.name == "postgresql":
+            s3_path = s3_path.collate("C")
+
+        result = await self.session.execute(
+            select(s3_path)
+            .where(and_(FileModel.storage_tier.in_(tiers), FileModel.storage_shard == shard, s3_path > after))
+            .distinct()
+            .order_by(s3_path)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def mark_missing(self, s3_paths: Sequence[str], tiers: Sequence[StorageTier], shard: str) -> int:
+        result = await self.session.execute(
+            update(FileModel)
+            .where(and_(
+                FileModel.s3_path.in_(s3_paths),
+                FileModel.storage_tier.in_(tiers),
+                FileModel.storage_shard == shard,
+                FileModel.missing_at.is_(None)
+            ))
+            .values(missing_at=func.now())
+        )
+        return result.rowcount
+
+    async def lock(self, file_id: int) -> bool:
+        result = await self.session.execute(select(FileModel.id).where(FileModel.id == file_id).with_for_update())
+        return result.first() is not None
+
+    async def delete(self, file_id: int) -> bool:
         result = await self.session.execute(select(FileModel).where(FileModel.id == file_id))
         file_model = result.scalar_one_or_none()
         if file_model:
             await self.session.delete(file_model)
             await self.session.flush()
+        return file_model is not None
 
     def _to_domain(self, model: FileModel) -> File:
         return File(
@@ -146,5 +310,350 @@ class FileRepository:
             department=model.department,
             download_count=model.download_count,
             created_at=model.created_at,
-            file_metadata=model.file_metadata
-        )
\ No newline at end of file
+            file_metadata=model.file_metadata,
+            codec=model.codec,
+            storage_tier=model.storage_tier,
+            storage_shard=model.storage_shard,
+            last_accessed_at=model.last_accessed_at,
+            missing_at=model.missing_at
+        )
+
+
+@instrumented
+class VersionRepository:
+    COLUMNS = tuple(FileVersionModel.__table__.columns)
+    CHUNK_COLUMNS = (
+        FileChunkModel.hash, FileChunkModel.size, FileChunkModel.stored_size,
+        FileChunkModel.codec, FileChunkModel.storage_shard
+    )
+    BATCH_SIZE = 1000
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_file(self, file_id: int) -> List[FileVersion]:
+        result = await self.session.execute(
+            select(*self.COLUMNS).where(FileVersionModel.file_id == file_id).order_by(FileVersionModel.version)
+        )
+        return [FileVersion(**row._mapping) for row in result]
+
+    async def get(self, file_id: int, version: int) -> Optional[FileVersion]:
+        result = await self.session.execute(
+            select(*self.COLUMNS).where(and_(FileVersionModel.file_id == file_id, FileVersionModel.version == version))
+        )
+        row = result.first()
+        return FileVersion(**row._mapping) if row else None
+
+    async def get_latest_number(self, file_id: int) -> int:
+        result = await self.session.execute(
+            select(func.max(FileVersionModel.version)).where(FileVersionModel.file_id == file_id)
+        )
+        return result.scalar() or 0
+
+    async def get_chunks(self, version_id: int) -> List[FileChunk]:
+        result = await self.session.execute(
+            select(*self.CHUNK_COLUMNS)
+            .join(FileVersionChunkModel, FileVersionChunkModel.chunk_hash == FileChunkModel.hash)
+            .where(FileVersionChunkModel.version_id == version_id)
+            .order_by(FileVersionChunkModel.position)
+        )
+        return [FileChunk(**row._mapping) for row in result]
+
+    async def get_chunks_by_hash(self, hashes: Sequence[str]) -> Dict[str, FileChunk]:
+        return await self._find_chunks(hashes, lock=False)
+
+    async def lock_chunks(self, hashes: Sequence[str]) -> Dict[str, FileChunk]:
+        # Строки блокируются в порядке хэшей, как и при освобождении: параллельные версии и удаления не зациклятся.
+        # Чанк с ref_count = 0 мог потерять объект при сбое удаления, его загружают заново
+        return await self._find_chunks(hashes, lock=True)
+
+    async def _find_chunks(self, hashes: Sequence[str], lock: bool) -> Dict[str, FileChunk]:
+        chunks = {}
+        hashes = sorted(hashes)
+        for start in range(0, len(hashes), self.BATCH_SIZE):
+            query = (
+                select(*self.CHUNK_COLUMNS)
+                .where(and_(FileChunkModel.hash.in_(hashes[start:start + self.BATCH_SIZE]), FileChunkModel.ref_count > 0))
+                .order_by(FileChunkModel.hash)
+            )
+            result = await self.session.execute(query.with_for_update() if lock else query)
+            chunks.update((row.hash, FileChunk(**row._mapping)) for row in result)
+        return chunks
+
+    async def get_chunk_hashes(self, after: str, limit: int, shard: str) -> List[str]:
+        result = await self.session.execute(
+            select(FileChunkModel.hash)
+            .where(and_(FileChunkModel.storage_shard == shard, FileChunkModel.hash > after))
+            .order_by(FileChunkModel.hash)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_chunk_page(self, after: str, limit: int) -> List[FileChunk]:
+        result = await self.session.execute(
+            select(*self.CHUNK_COLUMNS).where(FileChunkModel.hash > after).order_by(FileChunkModel.hash).limit(limit)
+        )
+        return [FileChunk(**row._mapping) for row in result]
+
+    async def move_chunk(self, chunk_hash: str, old_shard: str, new_shard: str) -> bool:
+        # Как и у файлов: строка меняется, только если чанк не освободили и не перенесли за время копирования
+        result = await self.session.execute(
+            update(FileChunkModel)
+            .where(and_(FileChunkModel.hash == chunk_hash, FileChunkModel.storage_shard == old_shard))
+            .values(storage_shard=new_shard)
+        )
+        return result.rowcount == 1
+
+    async def get_stored_chunks(self, hashes: Sequence[str], shard: str) -> List[str]:
+        result = await self.session.execute(
+            select(FileChunkModel.hash)
+            .where(and_(FileChunkModel.hash.in_(hashes), FileChunkModel.storage_shard == shard))
+        )
+        return list(result.scalars().all())
+
+    async def add_references(self, chunks: Sequence[FileChunk], counts: Dict[str, int]) -> None:
+        rows = [
+            {"hash": chunk.hash, "size": chunk.size, "stored_size": chunk.stored_size, "codec": chunk.codec,
+             "storage_shard": chunk.storage_shard, "ref_count": counts[chunk.hash]}
+            for chunk in sorted(chunks, key=lambda chunk: chunk.hash)
+        ]
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        for start in range(0, len(rows), self.BATCH_SIZE):
+            statement = insert(FileChunkModel).values(rows[start:start + self.BATCH_SIZE])
+            await self.session.execute(statement.on_conflict_do_update(
+                index_elements=[FileChunkModel.hash],
+                set_={
+                    "size": statement.excluded.size,
+                    "stored_size": statement.excluded.stored_size,
+                    "codec": statement.excluded.codec,
+                    "storage_shard": statement.excluded.storage_shard,
+                    "ref_count": FileChunkModel.ref_count + statement.excluded.ref_count
+                }
+            ))
+
+    async def create(self, file_id: int, version: int, size: int, original_filename: str, content_hash: str,
+                     chunk_hashes: Sequence[str], new_chunks: int, new_bytes: int, created_by: int,
+                     created_at: Optional[datetime] = None) -> FileVersion:
+        values = {
+            "file_id": file_id,
+            "version": version,
+            "size": size,
+            "original_filename": original_filename,
+            "content_hash": content_hash,
+            "chunk_count": len(chunk_hashes),
+            "new_chunks": new_chunks,
+            "new_bytes": new_bytes,
+            "created_by": created_by
+        }
+        if created_at is not None:
+            values["created_at"] = created_at
+        result = await self.session.execute(
+            FileVersionModel.__table__.insert().values(**values).returning(*self.COLUMNS)
+        )
+        file_version = FileVersion(**result.one()._mapping)
+
+        rows = [
+            {"version_id": file_version.id, "position": position, "chunk_hash": chunk_hash}
+            for position, chunk_hash in enumerate(chunk_hashes)
+        ]
+        if rows:
+            await self.session.execute(FileVersionChunkModel.__table__.insert(), rows)
+        return file_version
+
+    async def release(self, file_id: int) -> int:
+        # Возвращает число чанков, оставшихся без ссылок. Их строки удаляются, а объекты удалит сверка после
+        # grace-периода: удаление из MinIO до коммита уничтожило бы историю файла при откате
+        version_ids = select(FileVersionModel.id).where(FileVersionModel.file_id == file_id).scalar_subquery()
+        result = await self.session.execute(
+            select(FileVersionChunkModel.chunk_hash, func.count().label("released"))
+            .where(FileVersionChunkModel.version_id.in_(version_ids))
+            .group_by(FileVersionChunkModel.chunk_hash)
+        )
+        counts = sorted((row.chunk_hash, row.released) for row in result)
+
+        await self.session.execute(
+            delete(FileVersionChunkModel)
+            .where(FileVersionChunkModel.version_id.in_(version_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(
+            delete(FileVersionModel)
+            .where(FileVersionModel.file_id == file_id)
+            .execution_options(synchronize_session=False)
+        )
+        if not counts:
+            return 0
+
+        chunks = FileChunkModel.__table__
+        await self.session.execute(
+            chunks.update()
+            .where(chunks.c.hash == bindparam("chunk_hash"))
+            .values(ref_count=chunks.c.ref_count - bindparam("released")),
+            [{"chunk_hash": chunk_hash, "released": released} for chunk_hash, released in counts]
+        )
+
+        released = 0
+        hashes = [chunk_hash for chunk_hash, _ in counts]
+        for start in range(0, len(hashes), self.BATCH_SIZE):
+            result = await self.session.execute(
+                delete(FileChunkModel)
+                .where(and_(FileChunkModel.hash.in_(hashes[start:start + self.BATCH_SIZE]), FileChunkModel.ref_count <= 0))
+                .execution_options(synchronize_session=False)
+            )
+            released += result.rowcount
+        return released
+
+
+@instrumented
+class UsageRepository:
+    TOTAL = "*"
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def apply(self, owner_id: int, department: str, content_type: str,
+                    bytes_delta: int, count_delta: int) -> Dict[UsageScope, int]:
+        rows = [
+            {"scope": scope, "scope_id": scope_id, "content_type": key, "bytes": bytes_delta, "file_count": count_delta}
+            for scope, scope_id in ((UsageScope.USER, str(owner_id)), (UsageScope.DEPARTMENT, department))
+            for key in (content_type, self.TOTAL)
+        ]
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        statement = insert(StorageUsageModel).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[StorageUsageModel.scope, StorageUsageModel.scope_id, StorageUsageModel.content_type],
+            set_={
+                "bytes": StorageUsageModel.bytes + statement.excluded.bytes,
+                "file_count": StorageUsageModel.file_count + statement.excluded.file_count
+            }
+        ).returning(StorageUsageModel.scope, StorageUsageModel.content_type, StorageUsageModel.bytes)
+
+        result = await self.session.execute(statement)
+        return {row.scope: row.bytes for row in result if row.content_type == self.TOTAL}
+
+    async def get_totals(self, owner_id: int, department: str) -> Dict[UsageScope, int]:
+        keys = [(UsageScope.USER, str(owner_id), self.TOTAL), (UsageScope.DEPARTMENT, department, self.TOTAL)]
+        result = await self.session.execute(
+            select(StorageUsageModel.scope, StorageUsageModel.bytes).where(
+                tuple_(StorageUsageModel.scope, StorageUsageModel.scope_id, StorageUsageModel.content_type).in_(keys)
+            )
+        )
+        return {row.scope: row.bytes for row in result}
+
+    async def get_scope(self, scope: UsageScope, scope_id: str) -> List[StorageUsage]:
+        result = await self.session.execute(
+            select(*StorageUsageModel.__table__.columns).where(
+                and_(StorageUsageModel.scope == scope, StorageUsageModel.scope_id == scope_id)
+            )
+        )
+        return [StorageUsage(**row._mapping) for row in result]
+
+
+@instrumented
+class MetadataCacheRepository:
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, content_hash: str, content_type: str, extractor_version: int) -> Optional[dict]:
+        result = await self.session.execute(
+            select(MetadataCacheModel.file_metadata).where(
+                and_(
+                    MetadataCacheModel.content_hash == content_hash,
+                    MetadataCacheModel.content_type == content_type,
+                    MetadataCacheModel.extractor_version == extractor_version
+                )
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def put(self, content_hash: str, content_type: str, extractor_version: int, metadata: dict) -> None:
+        # Один и тот же файл могут обработать параллельно: побеждает первая запись
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        await self.session.execute(
+            insert(MetadataCacheModel).values(
+                content_hash=content_hash,
+                content_type=content_type,
+                extractor_version=extractor_version,
+                file_metadata=metadata
+            ).on_conflict_do_nothing()
+        )
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+@instrumented
+class AuditRepository:
+    COLUMNS = ("occurred_at", "user_id", "file_id", "action")
+    PARTITION_PREFIX = "access_events_"
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def partitioned(self) -> bool:
+        return self.session.bind.dialect.name == "postgresql"
+
+    async def add_many(self, events: Sequence[AccessEvent]) -> None:
+        records = [(event.occurred_at, event.user_id, event.file_id, event.action.value) for event in events]
+        if self.partitioned:
+            connection = await self.session.connection()
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                AccessEventModel.__tablename__, records=records, columns=list(self.COLUMNS)
+            )
+        else:
+            await self.session.execute(
+                AccessEventModel.__table__.insert(), [dict(zip(self.COLUMNS, record)) for record in records]
+            )
+
+    async def ensure_partitions(self, months: Iterable[date]) -> None:
+        if not self.partitioned:
+            return
+        for month in months:
+            await self.session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.PARTITION_PREFIX}{month:%Y_%m} PARTITION OF access_events "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{_next_month(month).isoformat()} 00:00+00')"
+            ))
+
+    async def drop_partitions_before(self, month: date) -> List[str]:
+        if not self.partitioned:
+            return []
+
+        result = await self.session.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'access_events'"
+        ))
+        expired = [
+            name for name in result.scalars().all()
+            if name.startswith(self.PARTITION_PREFIX) and name[len(self.PARTITION_PREFIX):] < f"{month:%Y_%m}"
+        ]
+        for name in expired:
+            await self.session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        return expired
+
+    async def query(self, since: datetime, until: datetime, limit: int, user_id: Optional[int] = None,
+                    file_id: Optional[int] = None, action: Optional[AuditAction] = None) -> List[AccessEvent]:
+        # Диапазон по occurred_at обязателен: по нему планировщик отсекает лишние секции
+        conditions = [AccessEventModel.occurred_at >= since, AccessEventModel.occurred_at < until]
+        if user_id is not None:
+            conditions.append(AccessEventModel.user_id == user_id)
+        if file_id is not None:
+            conditions.append(AccessEventModel.file_id == file_id)
+        if action is not None:
+            conditions.append(AccessEventModel.action == action.value)
+
+        result = await self.session.execute(
+            select(AccessEventModel.occurred_at, AccessEventModel.user_id, AccessEventModel.file_id, AccessEventModel.action)
+            .where(and_(*conditions))
+            .order_by(AccessEventModel.occurred_at.desc())
+            .limit(limit)
+        )
+        return [
+            AccessEvent(occurred_at=row.occurred_at, user_id=row.user_id, file_id=row.file_id, action=AuditAction(row.action))
+            for row in result
+        ]
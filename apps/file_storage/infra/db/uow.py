@@ -1,5 +1,5 @@
-from shared.db.uow import SQLAlchemyUoW
-from .repositories import UserRepository, FileRepository
+from shared.db.uow import SQLAlchemyUoW, SQLAlchemyReadOnlyUoW
+from .repositories import UserRepository, FileRepository, UsageRepository, MetadataCacheRepository, AuditRepository, VersionRepository
 
 
 class FileStorageUoW(SQLAlchemyUoW):
@@ -8,4 +8,12 @@ class FileStorageUoW(SQLAlchemyUoW):
         await super().__aenter__()
         self.user_repo = UserRepository(self.session)
         self.file_repo = FileRepository(self.session)
-        return self
\ No newline at end of file
+        self.usage_repo = UsageRepository(self.session)
+        self.metadata_cache_repo = MetadataCacheRepository(self.session)
+        self.audit_repo = AuditRepository(self.session)
+        self.version_repo = VersionRepository(self.session)
+        return self
+
+
+class FileStorageReadOnlyUoW(FileStorageUoW, SQLAlchemyReadOnlyUoW):
+    pass
\ No newline at end of file
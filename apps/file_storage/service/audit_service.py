@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from ..infra.db.uow import FileStorageUoW
+from ..domain.models.user import User
+from ..domain.models.access_event import AccessEvent
+from ..domain.enums.user_role import UserRole
+from ..domain.enums.audit_action import AuditAction
+from ..domain.exceptions.auth import InsufficientPermissions
+from config.settings import settings
+
+
+class AuditService:
+    DEFAULT_WINDOW = timedelta(days=1)
+
+    def __init__(self, uow: FileStorageUoW):
+        self.uow = uow
+
+    async def get_events(self, current_user: User, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                         user_id: Optional[int] = None, file_id: Optional[int] = None,
+                         action: Optional[AuditAction] = None, limit: int = 100) -> List[AccessEvent]:
+        if current_user.role != UserRole.ADMIN:
+            raise InsufficientPermissions("Only admins can view the audit log")
+
+        until = until or datetime.now(timezone.utc)
+        since = since or until - self.DEFAULT_WINDOW
+        limit = max(1, min(limit, settings.audit_query_max_limit))
+
+        async with self.uow:
+            return await self.uow.audit_repo.query(since, until, limit, user_id=user_id, file_id=file_id, action=action)
+
+    async def maintain_partitions(self) -> List[str]:
+        today = datetime.now(timezone.utc).date().replace(day=1)
+        upcoming = (today + timedelta(days=32)).replace(day=1)
+        retained_from = today
+        for _ in range(settings.audit_retention_months):
+            retained_from = (retained_from - timedelta(days=1)).replace(day=1)
+
+        # Секция следующего месяца создаётся заранее, старые удаляются целиком, без DELETE по строкам
+        async with self.uow:
+            await self.uow.audit_repo.ensure_partitions([today, upcoming])
+            dropped = await self.uow.audit_repo.drop_partitions_before(retained_from)
+            await self.uow.commit()
+        return dropped
@@ -1,26 +1,29 @@
+from typing import Optional
 from ..infra.db.uow import FileStorageUoW
+from ..infra.cache.user_cache import user_cache
 from ..domain.models.user import User
 from ..domain.exceptions.auth import InvalidCredentials, UserNotFound
 from shared.auth.jwt_handler import jwt_handler
 from shared.auth.password import password_handler
+from shared.metrics.registry import AUTH_LOGINS
 
 
 class AuthService:
 
-    def __init__(self, uow: FileStorageUoW):
+    def __init__(self, uow: FileStorageUoW, read_uow: Optional[FileStorageUoW] = None):
         self.uow = uow
+        self.read_uow = read_uow or uow
 
     async def login(self, username: str, password: str) -> str:
-        print(f"Login attempt: {username}")
-        async with self.uow:
-            user = await self.uow.user_repo.get_by_username(username)
-            print(f"User found: {user is not None}")
-            if user:
-                print(f"Password check: {password_handler.verify_password(password, user.hashed_password)}")
+        async with self.read_uow:
+            user = await self.read_uow.user_repo.get_by_username(username, with_password=True)
             if not user or not password_handler.verify_password(password, user.hashed_password):
+                AUTH_LOGINS.labels("failure").inc()
                 raise InvalidCredentials("Invalid username or password")
 
+            AUTH_LOGINS.labels("success").inc()
             return jwt_handler.create_token({"sub": user.username})
+
     async def get_current_user(self, token: str) -> User:
         try:
             payload = jwt_handler.decode_token(token)
@@ -28,11 +31,17 @@ class AuthService:
             if not username:
                 raise InvalidCredentials("Invalid token")
 
+            user = await user_cache.get(username)
+            if user:
+                return user
+
+            # Кэш заполняется с primary: отстающая реплика вернула бы роль до её смены на весь AUTH_CACHE_TTL
             async with self.uow:
                 user = await self.uow.user_repo.get_by_username(username)
                 if not user:
                     raise UserNotFound("User not found")
 
-                return user
+            await user_cache.set(user)
+            return user
         except ValueError:
             raise InvalidCredentials("Invalid token")
\ No newline at end of file
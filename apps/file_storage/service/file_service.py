@@ -1,13 +1,32 @@
-from typing import List, Tuple
+from collections import Counter
+from datetime import datetime
+from typing import Any, BinaryIO, Container, Dict, Iterable, Iterator, List, Optional, Tuple
 from fastapi import UploadFile
+import asyncio
+import hashlib
+import tempfile
 import uuid
 from ..infra.db.uow import FileStorageUoW
+from ..infra.audit.writer import audit_writer
 from ..domain.models.user import User
 from ..domain.models.file import File
+from ..domain.models.version import FileVersion, FileChunk
 from ..domain.enums.user_role import UserRole
 from ..domain.enums.file_visibility import FileVisibility
+from ..domain.enums.storage_tier import StorageTier
+from ..domain.enums.usage_scope import UsageScope
+from ..domain.enums.audit_action import AuditAction
 from ..domain.exceptions.file import *
-from shared.storage.minio_client import minio_client
+from ..domain.exceptions.auth import InsufficientPermissions
+from shared.storage.sharding import object_storage
+from shared.storage.compression import compressor
+from shared.storage.chunk_store import Chunk, chunk_store
+from shared.cache.versions import collection_versions
+from shared.notifications.broker import event_broker
+from .lifecycle_service import file_storage, storage_bucket
+from .listing_scopes import file_scopes, reader_scopes
+from .notification_service import file_event
+from config.settings import settings
 
 
 class FileService:
@@ -29,8 +48,9 @@ class FileService:
         UserRole.ADMIN: {FileVisibility.PRIVATE, FileVisibility.DEPARTMENT, FileVisibility.PUBLIC}
     }
 
-    def __init__(self, uow: FileStorageUoW):
+    def __init__(self, uow: FileStorageUoW, read_uow: Optional[FileStorageUoW] = None):
         self.uow = uow
+        self.read_uow = read_uow or uow
 
     async def upload_file(self, file: UploadFile, visibility: FileVisibility, user: User) -> File:
         file_ext = file.filename.split('.')[-1].lower()
@@ -44,13 +64,16 @@ class FileService:
         if visibility not in self.VISIBILITY_PERMISSIONS[user.role]:
             raise FileAccessDenied(f"You cannot create {visibility.value} files")
 
+        quotas = self._get_quotas(user)
+        if quotas:
+            async with self.read_uow:
+                usage = await self.read_uow.usage_repo.get_totals(user.id, user.department)
+            self._check_quotas(quotas, usage, file.size)
+
         file_id = str(uuid.uuid4())
         s3_path = f"{user.department}/{file_id}.{file_ext}"
-
-        try:
-            minio_client.upload_file(s3_path, file.file, file.content_type, file.size)
-        except Exception as e:
-            raise FileUploadFailed(f"File upload failed: {e}")
+        # Сжатие zstd и загрузка в MinIO блокируют, поэтому уходят из цикла событий
+        shard, codec = await asyncio.to_thread(self._store_object, s3_path, file.file, file.size, file.content_type)
 
         async with self.uow:
             db_file = await self.uow.file_repo.create(
@@ -61,22 +84,71 @@ class FileService:
                 visibility=visibility,
                 s3_path=s3_path,
                 owner_id=user.id,
-                department=user.department
+                department=user.department,
+                codec=codec,
+                storage_shard=shard
             )
+            usage = await self.uow.usage_repo.apply(user.id, user.department, file.content_type, file.size, 1)
+            try:
+                # Повторная проверка под блокировкой строк счётчиков защищает от параллельных загрузок
+                self._check_quotas(quotas, usage, 0)
+            except QuotaExceeded:
+                await asyncio.to_thread(object_storage.client(shard).delete_file, s3_path)
+                raise
+            # Версии коллекций увеличиваются и до коммита, и после (в _notify): если процесс упадёт между коммитом
+            # и Redis, тег, выданный до изменения, всё равно уже не совпадёт
+            await collection_versions.bump(file_scopes(db_file))
             await self.uow.commit()
 
-        from ..worker.tasks import extract_metadata
-        extract_metadata.delay(db_file.id)
+        await self._notify("uploaded", db_file)
+
+        from ..worker.tasks import enqueue_metadata_extraction
+        enqueue_metadata_extraction(db_file)
 
         return db_file
 
-    async def get_accessible_files(self, user: User) -> List[File]:
-        async with self.uow:
-            return await self.uow.file_repo.get_accessible_files(user.id, user.role, user.department)
+    async def get_listing_etag(self, user: User, include_metadata: bool = False) -> Optional[str]:
+        # Версии читаются до SQL: изменение между чтением версий и выборкой лишь даст лишний 200
+        versions = await collection_versions.get(reader_scopes(user))
+        if versions is None:
+            return None
+
+        key = f"{user.id}:{user.role.value}:{user.department}:{int(include_metadata)}:{versions}"
+        return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+    async def get_accessible_files(self, user: User, include_metadata: bool = False,
+                                   tagged: bool = False) -> List[File]:
+        # Версии в Redis растут после коммита на primary, и список с отстающей реплики закрепился бы под новым тегом.
+        # Реплика отстаёт не больше REPLICA_MAX_LAG плюс интервал проверки, поэтому primary нужен, только если
+        # коллекции читателя менялись за это время; остальные ответы под ETag идут с реплики
+        recent = tagged and await collection_versions.changed_within(
+            reader_scopes(user), settings.replica_max_lag + settings.replica_check_interval
+        )
+        uow = self.uow if recent else self.read_uow
+        async with uow:
+            return await uow.file_repo.get_accessible_files(
+                user.id, user.role, user.department, include_metadata=include_metadata
+            )
+
+    async def get_files_batch(self, file_ids: List[int], user: User) -> Tuple[List[File], List[int], List[int]]:
+        file_ids = list(dict.fromkeys(file_ids))
+        async with self.read_uow:
+            files, forbidden = await self.read_uow.file_repo.get_many_with_access(
+                file_ids, user.id, user.role, user.department
+            )
+
+        order = {file_id: index for index, file_id in enumerate(file_ids)}
+        files.sort(key=lambda file: order[file.id])
+        forbidden.sort(key=order.get)
+        for file in files:
+            audit_writer.record(user.id, file.id, AuditAction.VIEW)
+        existing = {file.id for file in files}.union(forbidden)
+        missing = [file_id for file_id in file_ids if file_id not in existing]
+        return files, forbidden, missing
 
     async def get_file_by_id(self, file_id: int, user: User) -> File:
-        async with self.uow:
-            file = await self.uow.file_repo.get_by_id(file_id)
+        async with self.read_uow:
+            file = await self.read_uow.file_repo.get_by_id(file_id)
             if not file:
                 raise FileNotFound("File not found")
 
@@ -85,33 +157,266 @@ class FileService:
 
             return file
 
-    async def download_file(self, file_id: int, user: User) -> Tuple[any, File]:
+    async def view_file(self, file_id: int, user: User) -> File:
         file = await self.get_file_by_id(file_id, user)
+        audit_writer.record(user.id, file.id, AuditAction.VIEW)
+        return file
+
+    async def download_file(self, file_id: int, user: User,
+                            accepted_encodings: Iterable[str] = ()) -> Tuple[Iterable[bytes], File, Optional[str]]:
+        file = await self.get_file_by_id(file_id, user)
+        audit_writer.record(user.id, file.id, AuditAction.DOWNLOAD)
 
         async with self.uow:
             await self.uow.file_repo.increment_download_count(file_id)
             await self.uow.commit()
 
-        file_stream = minio_client.download_file(file.s3_path)
-        return file_stream, file
+        # Версии коллекций не увеличиваются: иначе каждое скачивание публичного файла сбрасывало бы ETag листинга
+        # у всех пользователей. Тег слабый, счётчик скачиваний в списке обновится вместе со следующим изменением
 
-    async def delete_file(self, file_id: int, user: User) -> None:
+        raw_stream = file_storage(file).download_file(file.s3_path, storage_bucket(file))
+        if file.storage_tier == StorageTier.COLD:
+            from ..worker.tasks import enqueue_promotion
+            enqueue_promotion(file.id)
+
+        if file.codec and file.codec in accepted_encodings:
+            return compressor.iter_decompressed(raw_stream, None), file, file.codec
+
+        return compressor.iter_decompressed(raw_stream, file.codec), file, None
+
+    async def create_version(self, file_id: int, file: UploadFile, user: User) -> FileVersion:
+        current = await self.get_file_by_id(file_id, user)
+        if not self._can_modify(current, user):
+            raise FileAccessDenied("Cannot add versions to this file")
+
+        file_ext = file.filename.split('.')[-1].lower()
+        current_ext = current.filename.split('.')[-1].lower()
+        if file_ext != current_ext:
+            raise FileTypeNotAllowed(f"New version must be a .{current_ext} file")
+
+        if file_ext not in self.FILE_TYPE_LIMITS[user.role]:
+            raise FileTypeNotAllowed(f"File type .{file_ext} not allowed for your role")
+
+        if file.size > self.SIZE_LIMITS[user.role]:
+            raise FileSizeExceeded(f"File size exceeds limit for your role")
+
+        # Место учитывается на владельца, поэтому проверяется его квота, даже если версию грузит менеджер или админ
+        async with self.read_uow:
+            owner = user if current.owner_id == user.id else await self.read_uow.user_repo.get_by_id(current.owner_id)
+            quotas = self._get_quotas(owner) if owner else {}
+            growth = file.size - current.size
+            if quotas and growth > 0:
+                usage = await self.read_uow.usage_repo.get_totals(current.owner_id, current.department)
+                self._check_quotas(quotas, usage, growth)
+
+        async with self.uow:
+            has_history = await self.uow.version_repo.get_latest_number(file_id) > 0
+
+        # Содержимое до первой версии становится версией 1, чтобы следующие ссылались на его чанки
+        baseline = None if has_history else await asyncio.to_thread(self._read_content, current)
+        try:
+            baseline_chunks = await asyncio.to_thread(chunk_store.split, baseline) if baseline is not None else None
+            chunks, content_hash = await asyncio.to_thread(chunk_store.split, file.file)
+
+            # Недостающие чанки загружаются до транзакции, чтобы блокировки строк не держались на время передачи.
+            # Путь чанка задаётся содержимым, так что повторная загрузка безвредна, а лишние объекты удалит сверка
+            hashes = {chunk.hash for chunk in chunks}
+            if baseline_chunks:
+                hashes.update(chunk.hash for chunk in baseline_chunks[0])
+            async with self.uow:
+                existing = await self.uow.version_repo.get_chunks_by_hash(list(hashes))
+            uploaded: Dict[str, FileChunk] = {}
+            if baseline_chunks:
+                uploaded.update(await self._upload_chunks(baseline, baseline_chunks[0], existing, current.content_type))
+            uploaded.update(await self._upload_chunks(
+                file.file, chunks, existing.keys() | uploaded.keys(), current.content_type
+            ))
+
+            s3_path = f"{current.department}/{uuid.uuid4()}.{current_ext}"
+            shard, codec = await asyncio.to_thread(self._store_object, s3_path, file.file, file.size, current.content_type)
+
+            async with self.uow:
+                updated = await self.uow.file_repo.replace_content(file_id, current.s3_path, s3_path, file.size, codec, shard)
+                if updated is None:
+                    await asyncio.to_thread(object_storage.client(shard).delete_file, s3_path)
+                    raise FileVersionConflict("File was changed concurrently, retry the upload")
+
+                number = await self.uow.version_repo.get_latest_number(file_id)
+                # Кроме роста текущего объекта на владельца учитываются байты чанков, впервые сохранённые версиями
+                charged = growth
+                # Чанки обеих версий блокируются одним отсортированным запросом, в том же порядке, что и при удалении
+                known = await self.uow.version_repo.lock_chunks(list(hashes))
+                if baseline_chunks and number == 0:
+                    number += 1
+                    first = await self._add_version(
+                        current.id, number, known, uploaded, baseline, *baseline_chunks, current.size, current.original_filename,
+                        current.content_type, current.owner_id, current.created_at
+                    )
+                    charged += first.new_bytes
+                version = await self._add_version(
+                    current.id, number + 1, known, uploaded, file.file, chunks, content_hash, file.size, file.filename,
+                    current.content_type, user.id
+                )
+                charged += version.new_bytes
+
+                usage = await self.uow.usage_repo.apply(current.owner_id, current.department, current.content_type, charged, 0)
+                try:
+                    if charged > 0:
+                        self._check_quotas(quotas, usage, 0)
+                except QuotaExceeded:
+                    await asyncio.to_thread(object_storage.client(shard).delete_file, s3_path)
+                    raise
+                await collection_versions.bump(file_scopes(updated))
+                await self.uow.commit()
+        finally:
+            if baseline is not None:
+                baseline.close()
+
+        await asyncio.to_thread(file_storage(current).delete_file, current.s3_path, storage_bucket(current))
+        await self._notify("versioned", updated)
+
+        from ..worker.tasks import enqueue_metadata_extraction
+        enqueue_metadata_extraction(updated)
+
+        return version
+
+    async def get_versions(self, file_id: int, user: User) -> List[FileVersion]:
         file = await self.get_file_by_id(file_id, user)
+        async with self.read_uow:
+            return await self.read_uow.version_repo.get_by_file(file.id)
 
-        can_delete = (
-                user.role == UserRole.ADMIN or
-                file.owner_id == user.id or
-                (user.role == UserRole.MANAGER and file.department == user.department)
-        )
+    async def download_version(self, file_id: int, version: int, user: User) -> Tuple[Iterator[bytes], File, FileVersion]:
+        file = await self.get_file_by_id(file_id, user)
+        async with self.read_uow:
+            file_version = await self.read_uow.version_repo.get(file.id, version)
+            if not file_version:
+                raise FileVersionNotFound("Version not found")
+            chunks = await self.read_uow.version_repo.get_chunks(file_version.id)
+
+        audit_writer.record(user.id, file.id, AuditAction.DOWNLOAD)
+        stream = chunk_store.iter_content((chunk.hash, chunk.storage_shard, chunk.codec) for chunk in chunks)
+        return stream, file, file_version
 
-        if not can_delete:
+    async def delete_file(self, file_id: int, user: User) -> None:
+        file = await self.get_file_by_id(file_id, user)
+
+        if not self._can_modify(file, user):
             raise FileAccessDenied("Cannot delete this file")
 
         async with self.uow:
-            await self.uow.file_repo.delete(file_id)
+            if await self.uow.file_repo.lock(file_id):
+                # Строка перечитывается под блокировкой: параллельная версия могла сменить размер и объект после проверки прав
+                file = await self.uow.file_repo.get_by_id(file_id)
+                versions = await self.uow.version_repo.get_by_file(file_id)
+                await self.uow.version_repo.release(file_id)
+                await self.uow.file_repo.delete(file_id)
+                charged = file.size + sum(version.new_bytes for version in versions)
+                await self.uow.usage_repo.apply(file.owner_id, file.department, file.content_type, -charged, -1)
+                await collection_versions.bump(file_scopes(file))
             await self.uow.commit()
 
-        minio_client.delete_file(file.s3_path)
+        audit_writer.record(user.id, file.id, AuditAction.DELETE)
+        await self._notify("deleted", file)
+
+        await asyncio.to_thread(file_storage(file).delete_file, file.s3_path, storage_bucket(file))
+
+    def get_compression_stats(self, user: User) -> List[Dict[str, Any]]:
+        if user.role != UserRole.ADMIN:
+            raise InsufficientPermissions("Only admins can view storage statistics")
+
+        return compressor.get_stats()
+
+    def _store_object(self, s3_path: str, stream: BinaryIO, size: int, content_type: str) -> Tuple[str, Optional[str]]:
+        shard = object_storage.shard_for(s3_path)
+        data, stored_size, codec = compressor.compress(stream, size, content_type)
+
+        try:
+            object_storage.client(shard).upload_file(s3_path, data, content_type, stored_size)
+        except Exception as e:
+            raise FileUploadFailed(f"File upload failed: {e}")
+        finally:
+            if data is not stream:
+                data.close()
+        return shard, codec
+
+    def _read_content(self, file: File) -> BinaryIO:
+        content = tempfile.SpooledTemporaryFile(max_size=compressor.SPOOL_SIZE)
+        try:
+            raw = file_storage(file).download_file(file.s3_path, storage_bucket(file))
+            for block in compressor.iter_decompressed(raw, file.codec):
+                content.write(block)
+        except Exception as e:
+            content.close()
+            raise FileUploadFailed(f"Cannot read current file content: {e}")
+        content.seek(0)
+        return content
+
+    async def _add_version(self, file_id: int, number: int, known: Dict[str, FileChunk], uploaded: Dict[str, FileChunk],
+                           stream: BinaryIO, chunks: List[Chunk], content_hash: str, size: int, original_filename: str,
+                           content_type: str, created_by: int, created_at: Optional[datetime] = None) -> FileVersion:
+        # known — заблокированные чанки; сохранённые здесь добавляются в него для следующей версии той же транзакции
+        counts = Counter(chunk.hash for chunk in chunks)
+        referenced = [known[chunk_hash] for chunk_hash in counts if chunk_hash in known]
+        # Чанк, найденный до транзакции, мог освободиться вместе с последним ссылавшимся файлом: такой догружается здесь
+        uploaded.update(await self._upload_chunks(stream, chunks, known.keys() | uploaded.keys(), content_type))
+        added = [uploaded[chunk_hash] for chunk_hash in counts if chunk_hash not in known]
+        await self.uow.version_repo.add_references(referenced + added, counts)
+        known.update((chunk.hash, chunk) for chunk in added)
+        return await self.uow.version_repo.create(
+            file_id=file_id,
+            version=number,
+            size=size,
+            original_filename=original_filename,
+            content_hash=content_hash,
+            chunk_hashes=[chunk.hash for chunk in chunks],
+            new_chunks=len(added),
+            new_bytes=sum(chunk.stored_size for chunk in added),
+            created_by=created_by,
+            created_at=created_at
+        )
+
+    async def _upload_chunks(self, stream: BinaryIO, chunks: List[Chunk], skip: Container[str],
+                             content_type: str) -> Dict[str, FileChunk]:
+        first_seen: Dict[str, Chunk] = {}
+        for chunk in chunks:
+            if chunk.hash not in skip:
+                first_seen.setdefault(chunk.hash, chunk)
+        if not first_seen:
+            return {}
+
+        try:
+            stored = await asyncio.to_thread(chunk_store.upload, stream, list(first_seen.values()), content_type)
+        except Exception as e:
+            raise FileUploadFailed(f"File upload failed: {e}")
+        return {
+            chunk.hash: FileChunk(chunk.hash, chunk.size, stored[chunk.hash].stored_size, stored[chunk.hash].codec,
+                                  stored[chunk.hash].storage_shard)
+            for chunk in first_seen.values()
+        }
+
+    def _get_quotas(self, user: User) -> Dict[UsageScope, int]:
+        quotas = {
+            UsageScope.USER: settings.role_quota_bytes.get(user.role.value),
+            UsageScope.DEPARTMENT: settings.department_quota_bytes.get(user.department)
+        }
+        return {scope: quota for scope, quota in quotas.items() if quota is not None}
+
+    def _check_quotas(self, quotas: Dict[UsageScope, int], usage: Dict[UsageScope, int], incoming: int) -> None:
+        for scope, quota in quotas.items():
+            if usage.get(scope, 0) + incoming > quota:
+                raise QuotaExceeded(f"Storage quota exceeded for your {scope.value.lower()}")
+
+    async def _notify(self, event: str, file: File) -> None:
+        scopes = file_scopes(file)
+        await collection_versions.bump(scopes)
+        await event_broker.publish(event, scopes, file_event(file))
+
+    def _can_modify(self, file: File, user: User) -> bool:
+        return (
+                user.role == UserRole.ADMIN or
+                file.owner_id == user.id or
+                (user.role == UserRole.MANAGER and file.department == user.department)
+        )
 
     def _check_file_access(self, file: File, user: User) -> bool:
         if user.role == UserRole.ADMIN:
@@ -0,0 +1,166 @@
+import tempfile
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+from ..infra.db.uow import FileStorageUoW
+from ..domain.models.user import User
+from ..domain.models.file import File
+from ..domain.enums.user_role import UserRole
+from ..domain.enums.storage_tier import StorageTier
+from ..domain.exceptions.auth import InsufficientPermissions
+from shared.storage.minio_client import MinioClient
+from shared.storage.sharding import object_storage
+from shared.storage.compression import compressor
+from config.settings import settings
+
+
+def file_storage(file: File) -> MinioClient:
+    return object_storage.client(file.storage_shard)
+
+
+def storage_bucket(file: File) -> str:
+    storage = file_storage(file)
+    if file.storage_tier == StorageTier.COLD:
+        return storage.cold_bucket
+    return storage.bucket
+
+
+@dataclass
+class LifecyclePolicy:
+    cold_after_days: int
+    max_download_count: Optional[int] = None
+    recompress: bool = False
+
+
+class LifecycleService:
+    DEFAULT_SCOPE = "*"
+
+    def __init__(self, uow: FileStorageUoW):
+        self.uow = uow
+
+    def get_policy(self, department: Optional[str] = None) -> LifecyclePolicy:
+        policy = LifecyclePolicy(
+            cold_after_days=settings.lifecycle_cold_after_days,
+            max_download_count=settings.lifecycle_max_download_count,
+            recompress=settings.lifecycle_recompress
+        )
+        overrides = settings.lifecycle_department_policies.get(department) if department else None
+        return replace(policy, **overrides) if overrides else policy
+
+    async def get_report(self, user: User) -> Dict[str, Any]:
+        if user.role != UserRole.ADMIN:
+            raise InsufficientPermissions("Only admins can view lifecycle reports")
+
+        # Отчёт считается агрегатом по каждой области, без постраничного обхода кандидатов
+        report = {"dry_run": True, "files": 0, "bytes": 0, "departments": {}}
+        now = datetime.now(timezone.utc)
+        async with self.uow:
+            for scope, department, excluded, policy in self._scopes():
+                files, size = await self.uow.file_repo.count_cold_candidates(
+                    now - timedelta(days=policy.cold_after_days), policy.max_download_count,
+                    department=department, exclude_departments=excluded
+                )
+                report["departments"][scope] = {"files": files, "bytes": size}
+                report["files"] += files
+                report["bytes"] += size
+        return report
+
+    async def run(self, dry_run: bool = False, batch_size: Optional[int] = None) -> Dict[str, Any]:
+        batch_size = batch_size or settings.lifecycle_batch_size
+        report = {"dry_run": dry_run, "files": 0, "bytes": 0, "departments": {}}
+        now = datetime.now(timezone.utc)
+
+        for scope, department, excluded, policy in self._scopes():
+            accessed_before = now - timedelta(days=policy.cold_after_days)
+            scope_report = report["departments"].setdefault(scope, {"files": 0, "bytes": 0})
+            after_id = 0
+
+            while True:
+                async with self.uow:
+                    batch = await self.uow.file_repo.get_cold_candidates(
+                        accessed_before, policy.max_download_count, batch_size,
+                        after_id=after_id, department=department, exclude_departments=excluded
+                    )
+                if not batch:
+                    break
+                after_id = batch[-1].id
+
+                for file in batch:
+                    if not dry_run and not await self._demote(file, policy):
+                        continue
+                    scope_report["files"] += 1
+                    scope_report["bytes"] += file.size
+
+            report["files"] += scope_report["files"]
+            report["bytes"] += scope_report["bytes"]
+
+        return report
+
+    async def promote(self, file_id: int) -> bool:
+        async with self.uow:
+            file = await self.uow.file_repo.get_by_id(file_id)
+        if not file or file.storage_tier != StorageTier.COLD:
+            return False
+
+        hot_path = file.s3_path.removeprefix(settings.lifecycle_cold_prefix)
+        storage = file_storage(file)
+        storage.copy_file(file.s3_path, hot_path, storage.cold_bucket, storage.bucket)
+        return await self._switch(file, hot_path, StorageTier.HOT, file.codec)
+
+    async def _demote(self, file: File, policy: LifecyclePolicy) -> bool:
+        cold_path = f"{settings.lifecycle_cold_prefix}{file.s3_path}"
+        codec = file.codec
+
+        try:
+            if policy.recompress:
+                codec = self._recompress(file, cold_path)
+            else:
+                storage = file_storage(file)
+                storage.copy_file(file.s3_path, cold_path, storage.bucket, storage.cold_bucket)
+        except Exception as e:
+            print(f"Lifecycle move failed for file {file.id}: {e}")
+            return False
+
+        return await self._switch(file, cold_path, StorageTier.COLD, codec)
+
+    async def _switch(self, file: File, new_path: str, tier: StorageTier, codec: Optional[str]) -> bool:
+        async with self.uow:
+            moved = await self.uow.file_repo.move_to_tier(file.id, file.s3_path, new_path, tier, codec, file.storage_shard)
+            await self.uow.commit()
+            current = None if moved else await self.uow.file_repo.get_by_id(file.id)
+
+        # Объект-источник удаляется только после фиксации новой ссылки в БД
+        if moved:
+            file_storage(file).delete_file(file.s3_path, storage_bucket(file))
+        elif not self._points_at(current, new_path, tier, file.storage_shard):
+            # Путь назначения детерминирован: если параллельный перенос уже зафиксировал его, объект живой
+            file_storage(file).delete_file(new_path, storage_bucket(replace(file, storage_tier=tier)))
+        return moved
+
+    @staticmethod
+    def _points_at(file: Optional[File], s3_path: str, tier: StorageTier, shard: str) -> bool:
+        return file is not None and file.s3_path == s3_path and file.storage_tier == tier and file.storage_shard == shard
+
+    def _recompress(self, file: File, cold_path: str) -> Optional[str]:
+        with tempfile.SpooledTemporaryFile(max_size=compressor.SPOOL_SIZE) as plain:
+            storage = file_storage(file)
+            raw = storage.download_file(file.s3_path, storage_bucket(file))
+            for chunk in compressor.iter_decompressed(raw, file.codec):
+                plain.write(chunk)
+            plain.seek(0)
+
+            data, stored_size, codec = compressor.compress(
+                plain, file.size, file.content_type, level=settings.lifecycle_cold_compression_level
+            )
+            try:
+                storage.upload_file(cold_path, data, file.content_type, stored_size, storage.cold_bucket)
+            finally:
+                if data is not plain:
+                    data.close()
+        return codec
+
+    def _scopes(self) -> Iterator[Tuple[str, Optional[str], Sequence[str], LifecyclePolicy]]:
+        departments = tuple(settings.lifecycle_department_policies)
+        for department in departments:
+            yield department, department, (), self.get_policy(department)
+        yield self.DEFAULT_SCOPE, None, departments, self.get_policy()
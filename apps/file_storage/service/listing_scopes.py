@@ -0,0 +1,26 @@
+from typing import List
+from ..domain.models.file import File
+from ..domain.models.user import User
+from ..domain.enums.user_role import UserRole
+from ..domain.enums.file_visibility import FileVisibility
+
+GLOBAL_SCOPE = "global"
+PUBLIC_SCOPE = "public"
+ALL_DEPARTMENTS_SCOPE = "department:*"
+
+
+# Должно совпадать с правилами FileRepository.get_accessible_files
+def file_scopes(file: File) -> List[str]:
+    if file.visibility == FileVisibility.PUBLIC:
+        return [GLOBAL_SCOPE, PUBLIC_SCOPE]
+    if file.visibility == FileVisibility.DEPARTMENT:
+        return [GLOBAL_SCOPE, ALL_DEPARTMENTS_SCOPE, f"department:{file.department}"]
+    return [GLOBAL_SCOPE, f"user:{file.owner_id}"]
+
+
+def reader_scopes(user: User) -> List[str]:
+    if user.role == UserRole.ADMIN:
+        return [GLOBAL_SCOPE]
+    if user.role == UserRole.MANAGER:
+        return [PUBLIC_SCOPE, ALL_DEPARTMENTS_SCOPE, f"user:{user.id}"]
+    return [PUBLIC_SCOPE, f"department:{user.department}", f"user:{user.id}"]
@@ -0,0 +1,30 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+from ..domain.models.file import File
+from ..domain.models.user import User
+from shared.notifications.broker import event_broker
+from config.settings import settings
+from .listing_scopes import reader_scopes
+
+
+def file_event(file: File) -> Dict[str, Any]:
+    return {
+        "file_id": file.id,
+        "original_filename": file.original_filename,
+        "content_type": file.content_type,
+        "visibility": file.visibility.value,
+        "owner_id": file.owner_id,
+        "department": file.department
+    }
+
+
+class NotificationService:
+
+    async def stream(self, user: User) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        # None означает тишину дольше интервала heartbeat
+        async with event_broker.subscribe(reader_scopes(user)) as queue:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), settings.notification_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
@@ -0,0 +1,146 @@
+from typing import Any, Dict, Optional
+from ..infra.db.uow import FileStorageUoW
+from ..infra.cache.report_cache import report_cache
+from ..domain.models.user import User
+from ..domain.models.file import File
+from ..domain.models.version import FileChunk
+from ..domain.enums.user_role import UserRole
+from ..domain.enums.storage_tier import StorageTier
+from ..domain.exceptions.auth import InsufficientPermissions
+from shared.storage.minio_client import MinioClient
+from shared.storage.sharding import object_storage
+from shared.storage.chunk_store import ChunkStore
+from config.settings import settings
+from .lifecycle_service import file_storage, storage_bucket
+
+
+class RebalanceService:
+    REPORT = "rebalance"
+    CHUNK_CONTENT_TYPE = "application/octet-stream"
+
+    def __init__(self, uow: FileStorageUoW):
+        self.uow = uow
+
+    async def get_report(self, user: User) -> Dict[str, Any]:
+        if user.role != UserRole.ADMIN:
+            raise InsufficientPermissions("Only admins can view rebalance reports")
+
+        # Полный проход по таблице на каждый запрос слишком дорог: отдаётся результат последнего запуска задачи
+        report = await report_cache.get(self.REPORT)
+        return report or self._empty_report(dry_run=True)
+
+    async def run(self, dry_run: bool = False, batch_size: Optional[int] = None) -> Dict[str, Any]:
+        batch_size = batch_size or settings.rebalance_batch_size
+        report = self._empty_report(dry_run)
+        after_id = 0
+
+        while True:
+            async with self.uow:
+                batch = await self.uow.file_repo.get_page(after_id, batch_size)
+            if not batch:
+                break
+            after_id = batch[-1].id
+
+            for file in batch:
+                report["files_scanned"] += 1
+                target = object_storage.shard_for(file.s3_path)
+                if target == file.storage_shard:
+                    continue
+
+                if not dry_run and not await self._move(file, target):
+                    report["failed"] += 1
+                    continue
+                shard_report = report["shards"].setdefault(target, {"files": 0, "bytes": 0})
+                shard_report["files"] += 1
+                shard_report["bytes"] += file.size
+                report["files"] += 1
+                report["bytes"] += file.size
+
+        # Чанки версий размещаются кольцом по своему пути так же, как файлы, и переносятся следом
+        after_hash = ""
+        while True:
+            async with self.uow:
+                chunks = await self.uow.version_repo.get_chunk_page(after_hash, batch_size)
+            if not chunks:
+                break
+            after_hash = chunks[-1].hash
+
+            for chunk in chunks:
+                report["chunks_scanned"] += 1
+                target = object_storage.shard_for(ChunkStore.path(chunk.hash))
+                if target == chunk.storage_shard:
+                    continue
+
+                if not dry_run and not await self._move_chunk(chunk, target):
+                    report["failed"] += 1
+                    continue
+                report["chunks"] += 1
+                report["chunk_bytes"] += chunk.stored_size
+
+        return report
+
+    async def _move(self, file: File, target: str) -> bool:
+        source, source_bucket = file_storage(file), storage_bucket(file)
+        destination = object_storage.client(target)
+        destination_bucket = destination.cold_bucket if file.storage_tier == StorageTier.COLD else destination.bucket
+
+        try:
+            self._copy(file.s3_path, file.content_type, source, source_bucket, destination, destination_bucket)
+        except Exception as e:
+            print(f"Rebalance move failed for file {file.id}: {e}")
+            return False
+
+        async with self.uow:
+            moved = await self.uow.file_repo.move_to_shard(
+                file.id, file.s3_path, file.storage_tier, file.storage_shard, target
+            )
+            await self.uow.commit()
+            current = None if moved else await self.uow.file_repo.get_by_id(file.id)
+
+        # Как и при смене уровня, источник удаляется только после фиксации новой ссылки
+        if moved:
+            source.delete_file(file.s3_path, source_bucket)
+        elif not (current and current.s3_path == file.s3_path and current.storage_tier == file.storage_tier
+                  and current.storage_shard == target):
+            # Параллельный перенос мог уже зафиксировать тот же объект на целевом шарде — тогда он живой
+            destination.delete_file(file.s3_path, destination_bucket)
+        return moved
+
+    async def _move_chunk(self, chunk: FileChunk, target: str) -> bool:
+        path = ChunkStore.path(chunk.hash)
+        source = object_storage.client(chunk.storage_shard)
+        destination = object_storage.client(target)
+
+        try:
+            self._copy(path, self.CHUNK_CONTENT_TYPE, source, source.chunk_bucket, destination, destination.chunk_bucket)
+        except Exception as e:
+            print(f"Rebalance move failed for chunk {chunk.hash}: {e}")
+            return False
+
+        async with self.uow:
+            moved = await self.uow.version_repo.move_chunk(chunk.hash, chunk.storage_shard, target)
+            await self.uow.commit()
+
+        # Копию на целевом шарде при неудаче не трогаем: по тому же пути туда могла загрузить чанк новая версия,
+        # а настоящую сироту удалит сверка после grace-периода
+        if moved:
+            source.delete_file(path, source.chunk_bucket)
+        return moved
+
+    @staticmethod
+    def _copy(path: str, content_type: str, source: MinioClient, source_bucket: str,
+              destination: MinioClient, destination_bucket: str) -> None:
+        # Эндпоинты шардов разные, серверное копирование недоступно: объект передаётся потоком
+        raw = source.download_file(path, source_bucket)
+        try:
+            destination.upload_file(path, raw, content_type, int(raw.headers["Content-Length"]), destination_bucket)
+        finally:
+            raw.close()
+            raw.release_conn()
+
+    @staticmethod
+    def _empty_report(dry_run: bool) -> Dict[str, Any]:
+        return {
+            "dry_run": dry_run, "files_scanned": 0, "files": 0, "bytes": 0,
+            "chunks_scanned": 0, "chunks": 0, "chunk_bytes": 0, "failed": 0, "shards": {}
+        }
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+from ..infra.db.uow import FileStorageUoW
+from ..domain.enums.storage_tier import StorageTier
+from shared.storage.minio_client import MinioClient
+from shared.storage.sharding import object_storage
+from shared.storage.chunk_store import ChunkStore
+from config.settings import settings
+
+
+class ReconciliationService:
+
+    def __init__(self, uow: FileStorageUoW):
+        self.uow = uow
+
+    async def run(self, dry_run: bool = False) -> Dict[str, int]:
+        report = {
+            "objects_scanned": 0,
+            "rows_scanned": 0,
+            "orphans_found": 0,
+            "orphans_deleted": 0,
+            "orphans_in_grace": 0,
+            "dangling_rows": 0,
+            "dangling_chunks": 0
+        }
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.reconciliation_grace_minutes)
+
+        for shard, storage in object_storage.clients.items():
+            buckets: Dict[str, List[StorageTier]] = {}
+            buckets.setdefault(storage.bucket, []).append(StorageTier.HOT)
+            buckets.setdefault(storage.cold_bucket, []).append(StorageTier.COLD)
+
+            for bucket, tiers in buckets.items():
+                await self._reconcile_bucket(shard, storage, bucket, tiers, cutoff, dry_run, report)
+            # Бакет чанков сверяется с file_chunks: так удаляются чанки удалённых файлов и откатившихся версий
+            await self._reconcile_bucket(shard, storage, storage.chunk_bucket, None, cutoff, dry_run, report)
+
+        return report
+
+    async def _reconcile_bucket(self, shard: str, storage: MinioClient, bucket: str,
+                                tiers: Optional[Sequence[StorageTier]], cutoff: datetime, dry_run: bool,
+                                report: Dict[str, int]):
+        # Сортированное слияние листинга бакета и путей из БД: память ограничена размером пачки.
+        # tiers=None — бакет чанков, пути строятся из хэшей file_chunks
+        objects = iter(storage.list_files(bucket))
+        paths = self._iter_paths(shard, tiers) if tiers is not None else self._iter_chunk_paths(shard)
+        orphans: List[str] = []
+        dangling: List[str] = []
+
+        obj = next(objects, None)
+        path = await anext(paths, None)
+
+        while obj is not None or path is not None:
+            if path is None or (obj is not None and obj.object_name < path):
+                report["objects_scanned"] += 1
+                if obj.last_modified and obj.last_modified > cutoff:
+                    report["orphans_in_grace"] += 1
+                else:
+                    orphans.append(obj.object_name)
+                obj = next(objects, None)
+            elif obj is None or path < obj.object_name:
+                report["rows_scanned"] += 1
+                dangling.append(path)
+                path = await anext(paths, None)
+            else:
+                report["objects_scanned"] += 1
+                report["rows_scanned"] += 1
+                obj = next(objects, None)
+                path = await anext(paths, None)
+
+            if len(orphans) >= settings.reconciliation_batch_size:
+                await self._delete_orphans(shard, storage, bucket, tiers, orphans, dry_run, report)
+                orphans = []
+            if len(dangling) >= settings.reconciliation_batch_size:
+                await self._flag_dangling(shard, storage, bucket, tiers, dangling, dry_run, report)
+                dangling = []
+
+        if orphans:
+            await self._delete_orphans(shard, storage, bucket, tiers, orphans, dry_run, report)
+        if dangling:
+            await self._flag_dangling(shard, storage, bucket, tiers, dangling, dry_run, report)
+
+    async def _iter_paths(self, shard: str, tiers: Sequence[StorageTier]) -> AsyncIterator[str]:
+        after = ""
+        while True:
+            async with self.uow:
+                page = await self.uow.file_repo.get_s3_paths(tiers, after, settings.reconciliation_batch_size, shard)
+            if not page:
+                return
+            for path in page:
+                yield path
+            after = page[-1]
+
+    async def _iter_chunk_paths(self, shard: str) -> AsyncIterator[str]:
+        # Путь чанка начинается с первых символов хэша, поэтому порядок хэшей совпадает с порядком листинга
+        after = ""
+        while True:
+            async with self.uow:
+                page = await self.uow.version_repo.get_chunk_hashes(after, settings.reconciliation_batch_size, shard)
+            if not page:
+                return
+            for chunk_hash in page:
+                yield ChunkStore.path(chunk_hash)
+            after = page[-1]
+
+    async def _delete_orphans(self, shard: str, storage: MinioClient, bucket: str,
+                              tiers: Optional[Sequence[StorageTier]], orphans: List[str], dry_run: bool,
+                              report: Dict[str, int]):
+        if tiers is None:
+            # Путь чанка переиспользуется: новая версия могла сослаться на него уже после чтения листинга
+            async with self.uow:
+                stored = await self.uow.version_repo.get_stored_chunks([path.split("/")[-1] for path in orphans], shard)
+            stored_paths = {ChunkStore.path(chunk_hash) for chunk_hash in stored}
+            orphans = [path for path in orphans if path not in stored_paths]
+            if not orphans:
+                return
+
+        report["orphans_found"] += len(orphans)
+        if dry_run:
+            return
+        storage.delete_files(orphans, bucket)
+        report["orphans_deleted"] += len(orphans)
+
+    async def _flag_dangling(self, shard: str, storage: MinioClient, bucket: str, tiers: Optional[Sequence[StorageTier]],
+                             candidates: List[str], dry_run: bool, report: Dict[str, int]):
+        # Строка могла появиться после чтения листинга, поэтому кандидатов перепроверяем точечно
+        missing = [path for path in candidates if not storage.file_exists(path, bucket)]
+        if not missing:
+            return
+
+        if tiers is None:
+            # У чанков нет отметки об отсутствии объекта: такие строки только попадают в отчёт
+            report["dangling_chunks"] += len(missing)
+            return
+
+        report["dangling_rows"] += len(missing)
+        if dry_run:
+            return
+
+        async with self.uow:
+            await self.uow.file_repo.mark_missing(missing, tiers, shard)
+            await self.uow.commit()
@@ -0,0 +1,49 @@
+from typing import Any, Dict, Optional
+from ..infra.db.uow import FileStorageUoW
+from ..domain.models.user import User
+from ..domain.enums.user_role import UserRole
+from ..domain.enums.usage_scope import UsageScope
+from ..domain.exceptions.auth import InsufficientPermissions
+from config.settings import settings
+
+
+class UsageService:
+
+    def __init__(self, uow: FileStorageUoW):
+        self.uow = uow
+
+    async def get_usage(self, current_user: User, user_id: Optional[int] = None,
+                        department: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        if current_user.role != UserRole.ADMIN and (
+                user_id not in (None, current_user.id) or department not in (None, current_user.department)):
+            raise InsufficientPermissions("Only admins can view usage of other users and departments")
+
+        async with self.uow:
+            result = {}
+            if department is None:
+                user_id = current_user.id if user_id is None else user_id
+                user = current_user if user_id == current_user.id else await self.uow.user_repo.get_by_id(user_id)
+                role_quota = settings.role_quota_bytes.get(user.role.value) if user else None
+                result["user"] = await self._get_scope(UsageScope.USER, str(user_id), role_quota)
+                department = user.department if user else None
+
+            if department is not None:
+                result["department"] = await self._get_scope(
+                    UsageScope.DEPARTMENT, department, settings.department_quota_bytes.get(department)
+                )
+            return result
+
+    async def _get_scope(self, scope: UsageScope, scope_id: str, quota_bytes: Optional[int]) -> Dict[str, Any]:
+        rows = await self.uow.usage_repo.get_scope(scope, scope_id)
+        total = next((row for row in rows if row.content_type == self.uow.usage_repo.TOTAL), None)
+        return {
+            "scope": scope,
+            "scope_id": scope_id,
+            "bytes": total.bytes if total else 0,
+            "file_count": total.file_count if total else 0,
+            "quota_bytes": quota_bytes,
+            "content_types": [
+                {"content_type": row.content_type, "bytes": row.bytes, "file_count": row.file_count}
+                for row in rows if row.content_type != self.uow.usage_repo.TOTAL
+            ]
+        }
@@ -1,5 +1,6 @@
-from typing import List
+from typing import List, Optional
 from ..infra.db.uow import FileStorageUoW
+from ..infra.cache.user_cache import user_cache
 from ..domain.models.user import User
 from ..domain.enums.user_role import UserRole
 from ..domain.exceptions.auth import UserNotFound, InsufficientPermissions, UserAlreadyExists
@@ -8,8 +9,9 @@ from shared.auth.password import password_handler
 
 class UserService:
 
-    def __init__(self, uow: FileStorageUoW):
+    def __init__(self, uow: FileStorageUoW, read_uow: Optional[FileStorageUoW] = None):
         self.uow = uow
+        self.read_uow = read_uow or uow
 
     async def create_user(self, username: str, password: str, role: UserRole,
                           department: str, current_user: User) -> User:
@@ -30,8 +32,8 @@ class UserService:
         if current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
             raise InsufficientPermissions("Insufficient permissions")
 
-        async with self.uow:
-            user = await self.uow.user_repo.get_by_id(user_id)
+        async with self.read_uow:
+            user = await self.read_uow.user_repo.get_by_id(user_id)
             if not user:
                 raise UserNotFound("User not found")
 
@@ -42,11 +44,11 @@ class UserService:
 
     async def list_users(self, current_user: User) -> List[User]:
         if current_user.role == UserRole.ADMIN:
-            async with self.uow:
-                return await self.uow.user_repo.get_all()
+            async with self.read_uow:
+                return await self.read_uow.user_repo.get_all()
         elif current_user.role == UserRole.MANAGER:
-            async with self.uow:
-                return await self.uow.user_repo.get_by_department(current_user.department)
+            async with self.read_uow:
+                return await self.read_uow.user_repo.get_by_department(current_user.department)
         else:
             raise InsufficientPermissions("Insufficient permissions")
 
@@ -61,4 +63,6 @@ class UserService:
 
             updated_user = await self.uow.user_repo.update_role(user_id, new_role)
             await self.uow.commit()
-            return updated_user
\ No newline at end of file
+
+        await user_cache.invalidate(user.username)
+        return updated_user
\ No newline at end of file
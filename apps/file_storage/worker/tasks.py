@@ -1,10 +1,30 @@
 from celery import Celery
-import PyPDF2
-from docx import Document
+from celery.schedules import crontab
+from celery.signals import task_prerun, task_postrun, worker_ready, worker_process_shutdown
+from kombu import Queue
+from redis.exceptions import RedisError
+import hashlib
+import os
 import tempfile
-from shared.storage.minio_client import minio_client
+import time
+from shared.storage.sharding import object_storage
+from shared.storage.compression import compressor
+from shared.storage.redis_client import sync_redis_client
+from shared.metrics.registry import WORKER_TASK_SECONDS, METADATA_EXTRACTIONS
+from shared.metrics.exporter import start_worker_exporter, mark_process_dead
 from shared.db.connection import AsyncSessionLocal
-from ..infra.db.repositories import FileRepository
+from shared.cache.versions import collection_versions
+from shared.notifications.broker import event_broker
+from ..infra.db.repositories import FileRepository, MetadataCacheRepository
+from ..infra.db.uow import FileStorageUoW
+from ..infra.cache.report_cache import report_cache
+from ..domain.models.file import File
+from ..service.lifecycle_service import LifecycleService, file_storage, storage_bucket
+from ..service.reconciliation_service import ReconciliationService
+from ..service.rebalance_service import RebalanceService
+from ..service.audit_service import AuditService
+from ..service.listing_scopes import file_scopes
+from ..service.notification_service import file_event
 from config.settings import settings
 
 celery_app = Celery(
@@ -13,6 +33,116 @@ celery_app = Celery(
     backend=settings.redis_url
 )
 
+# Увеличивается при любом изменении результата извлечения: старые записи кэша перестают совпадать
+METADATA_EXTRACTOR_VERSION = 1
+
+METADATA_QUEUE = "metadata"
+METADATA_LARGE_QUEUE = "metadata-large"
+MAINTENANCE_QUEUE = "maintenance"
+QUEUES = (METADATA_QUEUE, METADATA_LARGE_QUEUE, MAINTENANCE_QUEUE)
+
+# В Redis-транспорте меньшее число означает более высокий приоритет
+PRIORITY_STEPS = [0, 3, 6, 9]
+INTERACTIVE_PRIORITY = 0
+BULK_PRIORITY = 9
+
+celery_app.conf.task_queues = [Queue(name) for name in QUEUES]
+celery_app.conf.task_default_queue = METADATA_QUEUE
+celery_app.conf.task_default_priority = INTERACTIVE_PRIORITY
+celery_app.conf.task_routes = {
+    "apps.file_storage.worker.tasks.promote_file": {"queue": MAINTENANCE_QUEUE},
+    "apps.file_storage.worker.tasks.run_lifecycle": {"queue": MAINTENANCE_QUEUE},
+    "apps.file_storage.worker.tasks.reconcile_storage": {"queue": MAINTENANCE_QUEUE},
+    "apps.file_storage.worker.tasks.rebalance_storage": {"queue": MAINTENANCE_QUEUE},
+    "apps.file_storage.worker.tasks.maintain_audit_partitions": {"queue": MAINTENANCE_QUEUE}
+}
+celery_app.conf.broker_transport_options = {
+    "priority_steps": PRIORITY_STEPS,
+    "sep": ":",
+    "queue_order_strategy": "priority"
+}
+# Приоритеты работают, только если воркер не набирает задачи впрок; для мелких файлов множитель поднимается флагом воркера
+celery_app.conf.worker_prefetch_multiplier = 1
+
+celery_app.conf.beat_schedule = {
+    "run-lifecycle": {
+        "task": "apps.file_storage.worker.tasks.run_lifecycle",
+        "schedule": crontab(hour=3, minute=0),
+        "options": {"priority": BULK_PRIORITY}
+    },
+    "reconcile-storage": {
+        "task": "apps.file_storage.worker.tasks.reconcile_storage",
+        "schedule": crontab(minute=30),
+        "options": {"priority": BULK_PRIORITY}
+    },
+    "maintain-audit-partitions": {
+        "task": "apps.file_storage.worker.tasks.maintain_audit_partitions",
+        "schedule": crontab(hour=4, minute=0),
+        "options": {"priority": BULK_PRIORITY}
+    }
+}
+
+
+def metadata_queue(file: File) -> str:
+    threshold = settings.metadata_large_file_bytes_by_type.get(file.content_type, settings.metadata_large_file_bytes)
+    return METADATA_LARGE_QUEUE if file.size >= threshold else METADATA_QUEUE
+
+
+def enqueue_metadata_extraction(file: File, interactive: bool = True) -> None:
+    _enqueue_once(extract_metadata, file.id, metadata_queue(file),
+                  INTERACTIVE_PRIORITY if interactive else BULK_PRIORITY)
+
+
+def enqueue_promotion(file_id: int) -> None:
+    _enqueue_once(promote_file, file_id, MAINTENANCE_QUEUE, INTERACTIVE_PRIORITY)
+
+
+def _dedup_key(task_name: str, file_id: int) -> str:
+    return f"task-dedup:{task_name}:{file_id}"
+
+
+def _enqueue_once(task, file_id: int, queue: str, priority: int) -> None:
+    # Пока задача по файлу ждёт в очереди, повторные постановки отбрасываются
+    try:
+        if not sync_redis_client.set(_dedup_key(task.name, file_id), 1, nx=True, ex=settings.task_dedup_ttl):
+            return
+    except RedisError:
+        pass
+    task.apply_async((file_id,), queue=queue, priority=priority)
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, task=None, args=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+    # Ключ снимается при старте: изменения после начала обработки должны поставить задачу заново
+    if task is not None and task.name in DEDUPLICATED_TASKS and args:
+        try:
+            sync_redis_client.delete(_dedup_key(task.name, args[0]))
+        except RedisError:
+            pass
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        WORKER_TASK_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@worker_ready.connect
+def _on_worker_ready(**kwargs):
+    object_storage.ensure_buckets()
+    start_worker_exporter(settings.worker_metrics_port, settings.redis_url, QUEUES, PRIORITY_STEPS)
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
+
 
 @celery_app.task
 def extract_metadata(file_id: int):
@@ -23,6 +153,7 @@ def extract_metadata(file_id: int):
 async def _extract_metadata_async(file_id: int):
     async with AsyncSessionLocal() as session:
         file_repo = FileRepository(session)
+        cache_repo = MetadataCacheRepository(session)
 
         file = await file_repo.get_by_id(file_id)
         if not file:
@@ -30,27 +161,88 @@ async def _extract_metadata_async(file_id: int):
 
         with tempfile.NamedTemporaryFile() as temp_file:
             try:
-                data = minio_client.download_file(file.s3_path)
-                temp_file.write(data.read())
+                digest = hashlib.sha256()
+                data = file_storage(file).download_file(file.s3_path, storage_bucket(file))
+                for chunk in compressor.iter_decompressed(data, file.codec):
+                    digest.update(chunk)
+                    temp_file.write(chunk)
                 temp_file.flush()
+                content_hash = digest.hexdigest()
+
+                metadata = await cache_repo.get(content_hash, file.content_type, METADATA_EXTRACTOR_VERSION)
+                if metadata is not None:
+                    result = "cached"
+                else:
+                    metadata = {}
 
-                metadata = {}
+                    if file.content_type == "application/pdf":
+                        metadata = _extract_pdf_metadata(temp_file.name)
+                    elif file.content_type in ["application/msword",
+                                               "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
+                        metadata = _extract_docx_metadata(temp_file.name)
 
-                if file.content_type == "application/pdf":
-                    metadata = _extract_pdf_metadata(temp_file.name)
-                elif file.content_type in ["application/msword",
-                                           "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
-                    metadata = _extract_docx_metadata(temp_file.name)
+                    # Ошибки не кэшируются: они могут быть временными
+                    result = "error" if "error" in metadata else "success"
+                    if result == "success":
+                        await cache_repo.put(content_hash, file.content_type, METADATA_EXTRACTOR_VERSION, metadata)
 
                 await file_repo.update_metadata(file_id, metadata)
+                # Как и в API, версии коллекций увеличиваются до коммита и после него
+                collection_versions.bump_sync(file_scopes(file))
                 await session.commit()
+                METADATA_EXTRACTIONS.labels(file.content_type, result).inc()
 
             except Exception as e:
-                await file_repo.update_metadata(file_id, {"error": f"Failed to extract metadata: {e}"})
+                await session.rollback()
+                metadata = {"error": f"Failed to extract metadata: {e}"}
+                await file_repo.update_metadata(file_id, metadata)
+                collection_versions.bump_sync(file_scopes(file))
                 await session.commit()
+                METADATA_EXTRACTIONS.labels(file.content_type, "error").inc()
+
+        scopes = file_scopes(file)
+        collection_versions.bump_sync(scopes)
+        event_broker.publish_sync("metadata_ready", scopes, {**file_event(file), "file_metadata": metadata})
+
+
+@celery_app.task
+def promote_file(file_id: int):
+    import asyncio
+    return asyncio.run(LifecycleService(FileStorageUoW(AsyncSessionLocal)).promote(file_id))
+
+
+DEDUPLICATED_TASKS = {extract_metadata.name, promote_file.name}
+
+
+@celery_app.task
+def run_lifecycle(dry_run: bool = False):
+    import asyncio
+    return asyncio.run(LifecycleService(FileStorageUoW(AsyncSessionLocal)).run(dry_run=dry_run))
+
+
+@celery_app.task
+def reconcile_storage(dry_run: bool = False):
+    import asyncio
+    return asyncio.run(ReconciliationService(FileStorageUoW(AsyncSessionLocal)).run(dry_run=dry_run))
+
+
+@celery_app.task(priority=BULK_PRIORITY)
+def rebalance_storage(dry_run: bool = False):
+    import asyncio
+    report = asyncio.run(RebalanceService(FileStorageUoW(AsyncSessionLocal)).run(dry_run=dry_run))
+    report_cache.set_sync(RebalanceService.REPORT, report)
+    return report
+
+
+@celery_app.task
+def maintain_audit_partitions():
+    import asyncio
+    return asyncio.run(AuditService(FileStorageUoW(AsyncSessionLocal)).maintain_partitions())
 
 
 def _extract_pdf_metadata(file_path: str):
+    import PyPDF2
+
     try:
         with open(file_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
@@ -66,6 +258,8 @@ def _extract_pdf_metadata(file_path: str):
 
 
 def _extract_docx_metadata(file_path: str):
+    from docx import Document
+
     try:
         doc = Document(file_path)
         return {
@@ -0,0 +1,43 @@
+import argparse
+import json
+from typing import Any, Dict
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path) as source:
+        return json.load(source)
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    baseline, candidate = _load(args.baseline), _load(args.candidate)
+    print(f"baseline  {baseline.get('revision', 'unknown')[:12]}")
+    print(f"candidate {candidate.get('revision', 'unknown')[:12]}")
+    print(f"{'scenario':<10} {'rps':>22} {'p50 ms':>22} {'p99 ms':>22} {'rss mb':>18}")
+
+    for scenario, after in candidate["scenarios"].items():
+        before = baseline["scenarios"].get(scenario)
+        if not before:
+            continue
+        rows = [
+            (before["throughput_rps"], after["throughput_rps"]),
+            (before["latency_ms"]["p50"], after["latency_ms"]["p50"]),
+            (before["latency_ms"]["p99"], after["latency_ms"]["p99"]),
+        ]
+        cells = [f"{b:>8.1f}->{a:<8.1f}{_change(b, a):>6}" for b, a in rows]
+        rss = f"{before['peak_rss_mb']:.0f}->{after['peak_rss_mb']:.0f}"
+        print(f"{scenario:<10} {' '.join(cells)} {rss:>12}")
+
+
+if __name__ == "__main__":
+    main()
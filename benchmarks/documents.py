@@ -0,0 +1,31 @@
+import io
+import random
+from docx import Document
+from PyPDF2 import PdfWriter
+
+PDF_CONTENT_TYPE = "application/pdf"
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def make_pdf(title: str, pages: int = 1, padding: int = 0) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    writer.add_metadata({"/Title": title, "/Author": "benchmark", "/Creator": "file-storage-api"})
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    # Комментарий после %%EOF не ломает разбор и позволяет получить файл нужного размера
+    if padding > 0:
+        buffer.write(b"\n%" + random.randbytes(padding // 2).hex().encode()[:padding])
+    return buffer.getvalue()
+
+
+def make_docx(title: str, paragraphs: int = 3) -> bytes:
+    document = Document()
+    document.core_properties.title = title
+    document.core_properties.author = "benchmark"
+    for index in range(paragraphs):
+        document.add_paragraph(f"{title} paragraph {index}")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
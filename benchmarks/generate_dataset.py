@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import io
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.documents import DOCX_CONTENT_TYPE, PDF_CONTENT_TYPE, make_docx, make_pdf  # noqa: E402
+
+FILE_COLUMNS = (
+    "filename", "original_filename", "size", "content_type", "visibility", "s3_path",
+    "owner_id", "department", "download_count", "created_at", "storage_tier"
+)
+USER_COLUMNS = ("username", "hashed_password", "role", "department", "created_at")
+MAX_FILE_SIZE = 100 * 1024 * 1024
+
+
+def _parse_distribution(value: str) -> Dict[str, float]:
+    weights = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        weights[name.strip().upper()] = float(weight)
+    return weights
+
+
+def _file_rows(args, owners: Sequence[Tuple[int, str]], now: datetime) -> Iterator[tuple]:
+    visibilities = list(args.visibility)
+    visibility_weights = [args.visibility[name] for name in visibilities]
+    mu = math.log(args.size_median)
+
+    for index in range(args.files):
+        owner_id, department = owners[random.randrange(len(owners))]
+        is_docx = random.random() < args.docx_ratio
+        extension, content_type = ("docx", DOCX_CONTENT_TYPE) if is_docx else ("pdf", PDF_CONTENT_TYPE)
+        file_id = uuid.UUID(int=random.getrandbits(128))
+        yield (
+            f"{file_id}.{extension}",
+            f"document-{index}.{extension}",
+            min(MAX_FILE_SIZE, max(1024, int(random.lognormvariate(mu, args.size_sigma)))),
+            content_type,
+            random.choices(visibilities, visibility_weights)[0],
+            f"{department}/{file_id}.{extension}",
+            owner_id,
+            department,
+            int(random.expovariate(1 / args.mean_downloads)) if args.mean_downloads else 0,
+            now - timedelta(seconds=random.randrange(args.max_age_days * 86400)),
+            "HOT"
+        )
+
+
+def _batches(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _insert(connection, table, columns: Sequence[str], batch: List[tuple]) -> None:
+    if connection.dialect.name == "postgresql":
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(table.name, records=batch, columns=list(columns))
+    else:
+        await connection.execute(table.insert(), [dict(zip(columns, row)) for row in batch])
+
+
+async def _create_users(connection, args, now: datetime) -> List[Tuple[int, str]]:
+    from sqlalchemy import select
+    from shared.auth.password import password_handler
+    from apps.file_storage.infra.db.models import UserModel
+
+    hashed = password_handler.hash_password(args.password)
+    rows = []
+    for index in range(args.users):
+        if index == 0:
+            role = "ADMIN"
+        elif random.random() < args.manager_ratio:
+            role = "MANAGER"
+        else:
+            role = "USER"
+        rows.append((f"{args.prefix}{index}", hashed, role, f"department-{index % args.departments}", now))
+
+    for batch in _batches(iter(rows), args.batch_size):
+        await _insert(connection, UserModel.__table__, USER_COLUMNS, batch)
+
+    result = await connection.execute(
+        select(UserModel.id, UserModel.department).where(UserModel.username.like(f"{args.prefix}%"))
+    )
+    return [(row.id, row.department) for row in result]
+
+
+async def _update_usage(connection, usage: Dict[tuple, List[int]]) -> None:
+    from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+    from apps.file_storage.infra.db.models import StorageUsageModel
+
+    rows = [
+        {"scope": scope, "scope_id": scope_id, "content_type": content_type, "bytes": totals[0], "file_count": totals[1]}
+        for (scope, scope_id, content_type), totals in usage.items()
+    ]
+    insert = postgresql_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    for start in range(0, len(rows), 1000):
+        statement = insert(StorageUsageModel).values(rows[start:start + 1000])
+        await connection.execute(statement.on_conflict_do_update(
+            index_elements=[StorageUsageModel.scope, StorageUsageModel.scope_id, StorageUsageModel.content_type],
+            set_={
+                "bytes": StorageUsageModel.bytes + statement.excluded.bytes,
+                "file_count": StorageUsageModel.file_count + statement.excluded.file_count
+            }
+        ))
+
+
+def _upload_blobs(rows: List[tuple], limit: int) -> int:
+    from shared.storage.minio_client import minio_client
+
+    uploaded = 0
+    for row in rows[:limit]:
+        title = row[1]
+        body = make_docx(title) if row[3] == DOCX_CONTENT_TYPE else make_pdf(title)
+        minio_client.upload_file(row[5], io.BytesIO(body), row[3], len(body))
+        uploaded += 1
+    return uploaded
+
+
+async def _enqueue_extraction(connection, paths: List[str]) -> None:
+    from sqlalchemy import select
+    from apps.file_storage.domain.models.file import File
+    from apps.file_storage.infra.db.models import FileModel
+    from apps.file_storage.infra.db.repositories import FileRepository
+    from apps.file_storage.worker.tasks import enqueue_metadata_extraction
+
+    result = await connection.execute(select(*FileRepository.COLUMNS).where(FileModel.s3_path.in_(paths)))
+    for row in result:
+        # Массовая загрузка идёт с фоновым приоритетом и не обгоняет в очереди загрузки пользователей
+        enqueue_metadata_extraction(File(**row._mapping), interactive=False)
+
+
+async def generate(args) -> None:
+    from shared.db.connection import engine
+    from apps.file_storage.infra.db.models import FileModel
+    from apps.file_storage.infra.db.repositories import UsageRepository
+    from apps.file_storage.domain.enums.usage_scope import UsageScope
+
+    now = datetime.now(timezone.utc)
+    usage: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0])
+    started = time.perf_counter()
+    loaded = blobs = 0
+
+    async with engine.begin() as connection:
+        owners = await _create_users(connection, args, now)
+    print(f"users: {len(owners)} in {time.perf_counter() - started:.1f}s")
+
+    for batch in _batches(_file_rows(args, owners, now), args.batch_size):
+        uploaded = []
+        if blobs < args.blobs:
+            uploaded = [row[5] for row in batch[:args.blobs - blobs]]
+            blobs += _upload_blobs(batch, args.blobs - blobs)
+
+        for row in batch:
+            size, content_type, owner_id, department = row[2], row[3], row[6], row[7]
+            for key in (
+                (UsageScope.USER, str(owner_id), content_type), (UsageScope.USER, str(owner_id), UsageRepository.TOTAL),
+                (UsageScope.DEPARTMENT, department, content_type), (UsageScope.DEPARTMENT, department, UsageRepository.TOTAL)
+            ):
+                usage[key][0] += size
+                usage[key][1] += 1
+
+        # Каждая пачка в своей транзакции, чтобы не держать гигантский WAL и блокировки
+        async with engine.begin() as connection:
+            await _insert(connection, FileModel.__table__, FILE_COLUMNS, batch)
+        if args.extract and uploaded:
+            async with engine.connect() as connection:
+                await _enqueue_extraction(connection, uploaded)
+        loaded += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"files: {loaded}/{args.files} ({loaded / elapsed:,.0f} rows/s)", end="\r", flush=True)
+
+    async with engine.begin() as connection:
+        await _update_usage(connection, usage)
+    await engine.dispose()
+
+    print(f"\nloaded {loaded} files, {blobs} blobs in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a synthetic users/files catalogue")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--departments", type=int, default=300)
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--visibility", type=_parse_distribution, default="PRIVATE=0.6,DEPARTMENT=0.3,PUBLIC=0.1",
+                        help="Weights per visibility, e.g. PRIVATE=0.6,DEPARTMENT=0.3,PUBLIC=0.1")
+    parser.add_argument("--size-median", type=int, default=200 * 1024, help="Median file size in bytes")
+    parser.add_argument("--size-sigma", type=float, default=1.2, help="Log-normal sigma of file sizes")
+    parser.add_argument("--docx-ratio", type=float, default=0.3)
+    parser.add_argument("--manager-ratio", type=float, default=0.05)
+    parser.add_argument("--mean-downloads", type=float, default=3.0)
+    parser.add_argument("--max-age-days", type=int, default=730)
+    parser.add_argument("--blobs", type=int, default=0,
+                        help="Upload small valid PDF/DOCX objects for the first N files (the rest have no object)")
+    parser.add_argument("--extract", action="store_true",
+                        help="Queue metadata extraction for uploaded blobs at bulk priority")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--prefix", default="gen-user-", help="Username prefix of generated users")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    unknown = set(args.visibility) - {"PRIVATE", "DEPARTMENT", "PUBLIC"}
+    if unknown:
+        parser.error(f"unknown visibility: {', '.join(sorted(unknown))}")
+
+    random.seed(args.seed)
+    asyncio.run(generate(args))
+
+
+if __name__ == "__main__":
+    main()
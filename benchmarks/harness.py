@@ -0,0 +1,136 @@
+import io
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class InMemoryObject(io.BytesIO):
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.headers = {"Content-Length": str(len(data))}
+
+    def release_conn(self):
+        pass
+
+
+# Подмножество API minio.Minio, которым пользуется MinioClient, поверх словаря в памяти
+class InMemoryObjectStore:
+
+    def __init__(self, *args, **kwargs):
+        self.objects: Dict[Tuple[str, str], Tuple[bytes, datetime]] = {}
+        self.buckets = set()
+        # Задержка на каждое чтение и запись, чтобы приблизить хранилище к сетевому
+        self.latency = 0.0
+        self._lock = threading.Lock()
+
+    def bucket_exists(self, bucket):
+        return bucket in self.buckets
+
+    def make_bucket(self, bucket):
+        self.buckets.add(bucket)
+
+    def put_object(self, bucket, name, data, length, content_type=None, **kwargs):
+        self._wait()
+        payload = data.read(length) if length >= 0 else data.read()
+        with self._lock:
+            self.objects[(bucket, name)] = (payload, datetime.now(timezone.utc))
+
+    def get_object(self, bucket, name, **kwargs):
+        self._wait()
+        return InMemoryObject(self._get(bucket, name)[0])
+
+    def stat_object(self, bucket, name, **kwargs):
+        payload, modified = self._get(bucket, name)
+        return SimpleNamespace(object_name=name, size=len(payload), last_modified=modified)
+
+    def copy_object(self, bucket, name, source, **kwargs):
+        payload, _ = self._get(source.bucket_name, source.object_name)
+        with self._lock:
+            self.objects[(bucket, name)] = (payload, datetime.now(timezone.utc))
+
+    def remove_object(self, bucket, name, **kwargs):
+        with self._lock:
+            self.objects.pop((bucket, name), None)
+
+    def remove_objects(self, bucket, delete_objects, **kwargs):
+        for delete_object in delete_objects:
+            self.remove_object(bucket, delete_object._name)
+        return iter(())
+
+    def list_objects(self, bucket, prefix=None, recursive=False, start_after=None, **kwargs):
+        with self._lock:
+            keys = sorted(name for object_bucket, name in self.objects if object_bucket == bucket)
+        for name in keys:
+            if prefix and not name.startswith(prefix):
+                continue
+            if start_after and name <= start_after:
+                continue
+            payload, modified = self.objects.get((bucket, name), (b"", None))
+            yield SimpleNamespace(object_name=name, size=len(payload), last_modified=modified)
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _get(self, bucket, name):
+        from minio.error import S3Error
+
+        try:
+            return self.objects[(bucket, name)]
+        except KeyError:
+            raise S3Error("NoSuchKey", "Object does not exist", name, None, None, None)
+
+
+def configure_environment(database_url: Optional[str], workdir: str) -> str:
+    database_url = database_url or f"sqlite+aiosqlite:///{os.path.join(workdir, 'benchmark.db')}"
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "REDIS_URL": "redis://benchmark:6379/0",
+        "MINIO_ENDPOINT": "benchmark:9000",
+        "MINIO_ACCESS_KEY": "benchmark",
+        "MINIO_SECRET_KEY": "benchmark",
+        "JWT_SECRET": "benchmark-secret",
+        "ENV": "benchmark",
+        "RATE_LIMIT_ENABLED": "false",
+    })
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return database_url
+
+
+def load_app():
+    # Заглушки подставляются до импорта приложения: модули сохраняют ссылки на клиентов при импорте
+    import fakeredis
+    import minio
+
+    minio.Minio = InMemoryObjectStore
+
+    import shared.storage.redis_client as redis_module
+    server = fakeredis.FakeServer()
+    redis_module.redis_client = fakeredis.FakeAsyncRedis(server=server)
+    redis_module.sync_redis_client = fakeredis.FakeRedis(server=server)
+
+    from apps.file_storage.worker.tasks import celery_app
+    celery_app.conf.broker_url = "memory://"
+    celery_app.conf.result_backend = "cache+memory://"
+    celery_app.conf.task_always_eager = False
+
+    import main
+    return main.app
+
+
+async def reset_database():
+    from shared.db.base import Base
+    from shared.db.connection import engine
+    import apps.file_storage.infra.db.models  # noqa: F401
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
@@ -0,0 +1,223 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import ROOT, configure_environment, load_app, reset_database  # noqa: E402
+from benchmarks.documents import PDF_CONTENT_TYPE, make_pdf  # noqa: E402
+
+SCENARIOS = ("login", "upload", "list", "revalidate", "get", "download", "extract")
+PASSWORD = "benchmark-password"
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def _drive(operation: Callable[[int], Awaitable[bool]], requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            ok = await operation(index)
+            latencies.append(time.perf_counter() - started)
+            errors += 0 if ok else 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p90": round(_percentile(latencies, 90) * 1000, 3),
+            "p99": round(_percentile(latencies, 99) * 1000, 3),
+            "max": round(max(latencies, default=0.0) * 1000, 3)
+        },
+        "peak_rss_mb": round(_peak_rss_mb(), 1)
+    }
+
+
+async def _seed(files: int, users: int, departments: int, file_size: int) -> Dict[str, Any]:
+    from shared.auth.password import password_handler
+    from shared.db.connection import AsyncSessionLocal
+    from shared.storage.minio_client import minio_client
+    from config.settings import settings
+    from apps.file_storage.infra.db.models import UserModel, FileModel
+    from apps.file_storage.domain.enums.user_role import UserRole
+    from apps.file_storage.domain.enums.file_visibility import FileVisibility
+
+    hashed = password_handler.hash_password(PASSWORD)
+    body = make_pdf("seed", padding=max(0, file_size - 1024))
+
+    async with AsyncSessionLocal() as session:
+        user_rows = [
+            {"username": f"user{index}", "hashed_password": hashed, "department": f"dept{index % departments}",
+             "role": UserRole.ADMIN if index == 0 else UserRole.USER}
+            for index in range(users)
+        ]
+        await session.execute(UserModel.__table__.insert(), user_rows)
+
+        visibilities = list(FileVisibility)
+        file_rows = []
+        for index in range(files):
+            owner = index % users + 1
+            department = f"dept{(owner - 1) % departments}"
+            s3_path = f"{department}/seed-{index}.pdf"
+            minio_client.client.put_object(settings.minio_bucket, s3_path, io.BytesIO(body), len(body))
+            file_rows.append({
+                "filename": f"seed-{index}.pdf", "original_filename": f"seed-{index}.pdf", "size": len(body),
+                "content_type": PDF_CONTENT_TYPE, "visibility": visibilities[index % len(visibilities)],
+                "s3_path": s3_path, "owner_id": owner, "department": department, "download_count": 0
+            })
+        if file_rows:
+            await session.execute(FileModel.__table__.insert(), file_rows)
+        await session.commit()
+
+    return {"users": users, "files": files, "departments": departments, "file_size": len(body)}
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+
+    app = load_app()
+    await reset_database()
+    dataset = await _seed(args.files, args.users, args.departments, args.file_size)
+
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, Any] = {}
+
+    # Сценарии идут внутри lifespan приложения: на выходе дописывается журнал доступа и закрываются соединения
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://benchmark/api/v1") as client:
+        tokens = {}
+        for index in range(min(args.users, 8)):
+            response = await client.post("/auth/login", json={"username": f"user{index}", "password": PASSWORD})
+            tokens[index] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        admin = tokens[0]
+        file_ids = list(range(1, args.files + 1))
+        upload_body = make_pdf("upload", padding=max(0, args.file_size - 1024))
+
+        async def login(index):
+            response = await client.post("/auth/login", json={"username": f"user{index % args.users}", "password": PASSWORD})
+            return response.status_code == 200
+
+        async def upload(index):
+            response = await client.post(
+                "/files/upload", headers=admin, data={"visibility": "PUBLIC"},
+                files={"file": (f"upload-{index}.pdf", upload_body, PDF_CONTENT_TYPE)}
+            )
+            return response.status_code == 200
+
+        async def list_files(index):
+            response = await client.get("/files", headers=tokens[index % len(tokens)])
+            return response.status_code == 200
+
+        etags = {}
+
+        async def revalidate(index):
+            headers = tokens[index % len(tokens)]
+            if index % len(tokens) not in etags:
+                etags[index % len(tokens)] = (await client.get("/files", headers=headers)).headers.get("etag")
+            response = await client.get("/files", headers={**headers, "If-None-Match": etags[index % len(tokens)] or ""})
+            return response.status_code in (200, 304)
+
+        async def get_file(index):
+            response = await client.get(f"/files/{random.choice(file_ids)}", headers=admin)
+            return response.status_code == 200
+
+        async def download(index):
+            response = await client.get(f"/files/{random.choice(file_ids)}/download", headers=admin)
+            return response.status_code == 200
+
+        async def extract(index):
+            from apps.file_storage.worker.tasks import _extract_metadata_async
+            # Тело задачи вызывается напрямую в том же цикле событий, брокер в памяти не участвует
+            await _extract_metadata_async(random.choice(file_ids))
+            return True
+
+        operations = {
+            "login": login, "upload": upload, "list": list_files, "revalidate": revalidate,
+            "get": get_file, "download": download, "extract": extract
+        }
+        for scenario in args.scenarios:
+            if scenario in ("get", "download", "extract") and not file_ids:
+                continue
+            results[scenario] = await _drive(operations[scenario], args.requests, args.concurrency)
+
+    return {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "database": "sqlite" if args.database_url is None else args.database_url.split(":", 1)[0],
+        "dataset": dataset,
+        "scenarios": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process benchmark of the File Storage API")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--file-size", type=int, default=64 * 1024)
+    parser.add_argument("--database-url", default=None, help="Async SQLAlchemy URL; SQLite in a temp dir by default")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(args.database_url, workdir)
+        report = asyncio.run(run(args))
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(payload)
+    print(payload)
+
+
+if __name__ == "__main__":
+    main()
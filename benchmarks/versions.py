@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import configure_environment, load_app, reset_database  # noqa: E402
+from benchmarks.documents import PDF_CONTENT_TYPE  # noqa: E402
+from benchmarks.run import PASSWORD, _git_revision, _peak_rss_mb  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def _edit(body: bytearray, edits: int, edit_size: int) -> bytearray:
+    # Правки как у редактируемого договора: вставки, удаления и замены небольших участков
+    body = bytearray(body)
+    for _ in range(edits):
+        position = random.randrange(len(body) + 1)
+        length = random.randint(1, edit_size)
+        kind = random.choice(("insert", "delete", "replace"))
+        if kind == "insert":
+            body[position:position] = random.randbytes(length)
+        elif kind == "delete":
+            del body[position:position + length]
+        else:
+            body[position:position + length] = random.randbytes(length)
+    return body
+
+
+async def _seed_admin() -> None:
+    from shared.auth.password import password_handler
+    from shared.db.connection import AsyncSessionLocal
+    from apps.file_storage.infra.db.models import UserModel
+    from apps.file_storage.domain.enums.user_role import UserRole
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(UserModel.__table__.insert(), [{
+            "username": "admin", "hashed_password": password_handler.hash_password(PASSWORD),
+            "department": "benchmark", "role": UserRole.ADMIN
+        }])
+        await session.commit()
+
+
+def _bucket_bytes() -> Dict[str, int]:
+    from shared.storage.sharding import object_storage
+
+    totals: Dict[str, int] = {}
+    for storage in object_storage.clients.values():
+        for bucket in (storage.bucket, storage.cold_bucket, storage.chunk_bucket):
+            totals[bucket] = totals.get(bucket, 0) + sum(obj.size for obj in storage.list_files(bucket))
+    return totals
+
+
+def _set_latency(seconds: float) -> None:
+    from shared.storage.sharding import object_storage
+
+    for storage in object_storage.clients.values():
+        storage.client.latency = seconds
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+    from config.settings import settings
+
+    app = load_app()
+    await reset_database()
+    await _seed_admin()
+    _set_latency(args.storage_latency_ms / 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    # Сценарии идут внутри lifespan приложения: на выходе дописывается журнал доступа и закрываются соединения
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://benchmark/api/v1", timeout=None) as client:
+        response = await client.post("/auth/login", json={"username": "admin", "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        body = bytearray(random.randbytes(args.size))
+        response = await client.post(
+            "/files/upload", headers=headers, data={"visibility": "PRIVATE"},
+            files={"file": ("contract.pdf", bytes(body), PDF_CONTENT_TYPE)}
+        )
+        response.raise_for_status()
+        file_id = response.json()["id"]
+
+        expected = {1: hashlib.sha256(body).hexdigest()}
+        upload_seconds: List[float] = []
+        uploaded_bytes = 0
+        for number in range(2, args.versions + 2):
+            body = _edit(body, args.edits, args.edit_size)
+            started = time.perf_counter()
+            response = await client.post(
+                f"/files/{file_id}/versions", headers=headers,
+                files={"file": (f"contract-v{number}.pdf", bytes(body), PDF_CONTENT_TYPE)}
+            )
+            upload_seconds.append(time.perf_counter() - started)
+            response.raise_for_status()
+            uploaded_bytes += len(body)
+            expected[number] = hashlib.sha256(body).hexdigest()
+
+        versions = (await client.get(f"/files/{file_id}/versions", headers=headers)).json()["versions"]
+        for version in versions:
+            if version["content_hash"] != expected[version["version"]]:
+                raise SystemExit(f"version {version['version']}: content hash mismatch")
+
+        logical = sum(version["size"] for version in versions)
+        buckets = _bucket_bytes()
+        chunk_bytes = buckets.get(settings.minio_chunk_bucket, 0)
+        current_bytes = buckets.get(settings.minio_bucket, 0) + buckets.get(settings.minio_cold_bucket, 0)
+
+        async def download(path: str) -> str:
+            digest = hashlib.sha256()
+            async with client.stream("GET", path, headers=headers) as stream:
+                stream.raise_for_status()
+                async for block in stream.aiter_bytes():
+                    digest.update(block)
+            return digest.hexdigest()
+
+        reassembly = {}
+        for prefetch in args.prefetch:
+            settings.chunk_prefetch = prefetch
+            latencies = []
+            for _ in range(args.repeat):
+                for version in versions:
+                    started = time.perf_counter()
+                    digest = await download(f"/files/{file_id}/versions/{version['version']}/download")
+                    latencies.append(time.perf_counter() - started)
+                    if digest != version["content_hash"]:
+                        raise SystemExit(f"version {version['version']}: reassembled content differs")
+            reassembly[str(prefetch)] = {
+                "downloads": len(latencies),
+                "throughput_mb_s": round(logical * args.repeat / MB / sum(latencies), 2),
+                "latency_ms": {
+                    "mean": round(statistics.fmean(latencies) * 1000, 3),
+                    "max": round(max(latencies) * 1000, 3)
+                }
+            }
+
+        latencies = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            await download(f"/files/{file_id}/download")
+            latencies.append(time.perf_counter() - started)
+
+    return {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "database": "sqlite" if args.database_url is None else args.database_url.split(":", 1)[0],
+        "dataset": {
+            "size": args.size, "versions": len(versions), "edits": args.edits, "edit_size": args.edit_size,
+            "chunk_avg_size": settings.chunk_avg_size, "storage_latency_ms": args.storage_latency_ms
+        },
+        # База сравнения — каждая версия целым объектом. Текущая версия хранится и чанками, и целым объектом,
+        # поэтому её копия входит в stored_bytes и savings; chunk_savings показывает экономию одних чанков
+        "storage": {
+            "whole_object_bytes": logical,
+            "chunk_bytes": chunk_bytes,
+            "duplicate_current_bytes": current_bytes,
+            "stored_bytes": chunk_bytes + current_bytes,
+            "dedup_ratio": round(logical / chunk_bytes, 2) if chunk_bytes else 0.0,
+            "savings": round(1 - (chunk_bytes + current_bytes) / logical, 4) if logical else 0.0,
+            "chunk_savings": round(1 - chunk_bytes / logical, 4) if logical else 0.0,
+            "new_bytes_per_version": [version["new_bytes"] for version in versions]
+        },
+        "upload": {
+            "versions": len(upload_seconds),
+            "throughput_mb_s": round(uploaded_bytes / MB / sum(upload_seconds), 2) if upload_seconds else 0.0,
+            "latency_ms": {"mean": round(statistics.fmean(upload_seconds) * 1000, 3) if upload_seconds else 0.0}
+        },
+        "reassembly": reassembly,
+        "current_download": {
+            "throughput_mb_s": round(versions[-1]["size"] * args.repeat / MB / sum(latencies), 2),
+            "latency_ms": {"mean": round(statistics.fmean(latencies) * 1000, 3)}
+        },
+        "peak_rss_mb": round(_peak_rss_mb(), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage savings and reassembly throughput of file versions")
+    parser.add_argument("--size", type=int, default=4 * MB, help="Size of the first version in bytes")
+    parser.add_argument("--versions", type=int, default=10, help="Number of versions uploaded after the first")
+    parser.add_argument("--edits", type=int, default=5, help="Random inserts/deletes/replacements per version")
+    parser.add_argument("--edit-size", type=int, default=4096, help="Maximum length of a single edit in bytes")
+    parser.add_argument("--prefetch", type=int, nargs="+", default=[1, 8], help="CHUNK_PREFETCH values to compare")
+    parser.add_argument("--repeat", type=int, default=3, help="Downloads of every version per prefetch value")
+    parser.add_argument("--storage-latency-ms", type=float, default=0.0, help="Delay added to every storage call")
+    parser.add_argument("--database-url", default=None, help="Async SQLAlchemy URL; SQLite in a temp dir by default")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(args.database_url, workdir)
+        report = asyncio.run(run(args))
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(payload)
+    print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,85 @@
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     database_url: str
+    database_replica_urls: List[str] = []
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_recycle: int = 1800
+    db_pool_timeout: float = 30.0
+    db_pool_pre_ping: bool = True
+    replica_max_lag: float = 5.0
+    replica_check_interval: float = 5.0
+    replica_check_timeout: float = 1.0
     redis_url: str
     minio_endpoint: str
     minio_access_key: str
     minio_secret_key: str
     minio_bucket: str = "files"
+    minio_cold_bucket: str = "files-cold"
+    minio_chunk_bucket: str = "files-chunks"
+    minio_shards: List[Dict[str, Any]] = []
+    minio_shard_vnodes: int = 64
+    rebalance_batch_size: int = 200
+    compression_enabled: bool = False
+    compression_level: int = 3
+    compression_min_ratio: float = 0.9
+    compression_min_size: int = 4096
+    chunk_min_size: int = 16 * 1024
+    chunk_avg_size: int = 64 * 1024
+    chunk_max_size: int = 256 * 1024
+    chunk_prefetch: int = 8
+    chunk_transfer_workers: int = 16
+    lifecycle_cold_after_days: int = 180
+    lifecycle_max_download_count: Optional[int] = None
+    lifecycle_recompress: bool = False
+    lifecycle_cold_compression_level: int = 19
+    lifecycle_cold_prefix: str = "cold/"
+    lifecycle_batch_size: int = 500
+    lifecycle_department_policies: Dict[str, Dict[str, Any]] = {}
+    reconciliation_grace_minutes: int = 60
+    reconciliation_batch_size: int = 1000
+    role_quota_bytes: Dict[str, int] = {}
+    department_quota_bytes: Dict[str, int] = {}
+    redis_socket_timeout: float = 0.5
+    rate_limit_enabled: bool = True
+    # Адреса и подсети прокси (nginx, балансировщик), которым доверяется X-Forwarded-For
+    trusted_proxies: List[str] = []
+    rate_limits: Dict[str, Dict[str, Dict[str, float]]] = {
+        "ANONYMOUS": {"login": {"per_minute": 10, "burst": 5}},
+        "USER": {"upload": {"per_minute": 10, "burst": 5}, "download": {"per_minute": 120, "burst": 30}},
+        "MANAGER": {"upload": {"per_minute": 30, "burst": 10}, "download": {"per_minute": 300, "burst": 60}},
+        "ADMIN": {"upload": {"per_minute": 60, "burst": 20}, "download": {"per_minute": 600, "burst": 120}}
+    }
+    max_concurrent_uploads: int = 16
+    max_concurrent_downloads: int = 64
+    max_waiting_transfers: int = 64
+    transfer_queue_timeout: float = 10.0
+    auth_cache_ttl: int = 300
+    notification_queue_size: int = 100
+    notification_heartbeat_seconds: float = 15.0
+    worker_metrics_port: int = 9100
+    metadata_large_file_bytes: int = 10 * 1024 * 1024
+    metadata_large_file_bytes_by_type: Dict[str, int] = {
+        "application/msword": 5 * 1024 * 1024,
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document": 5 * 1024 * 1024
+    }
+    task_dedup_ttl: int = 600
+    audit_enabled: bool = True
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval: float = 1.0
+    audit_retention_months: int = 12
+    audit_query_max_limit: int = 1000
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 30
     env: str = "local"
+    db_auto_create: bool = False
+    readiness_timeout: float = 2.0
+    bucket_setup_max_backoff: float = 30.0
 
     class Config:
         env_file = ".env"
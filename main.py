@@ -1,17 +1,52 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from apps.file_storage.infra.api.endpoints import router as file_storage_router
-from shared.db.connection import engine
+from apps.file_storage.infra.api.admission import UploadAdmissionMiddleware
+from apps.file_storage.infra.audit.writer import audit_writer
+from shared.db.connection import engine, replica_engines
 from shared.db.base import Base
+from shared.health.readiness import bucket_setup, check_readiness
+from shared.metrics.http import PrometheusMiddleware, metrics_response
+from shared.notifications.broker import event_broker
+from shared.storage.redis_client import redis_client
+from config.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.db_auto_create:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    # Бакеты создаются в фоне с повторами: медленный MinIO не должен задерживать старт, готовность покажет /ready
+    buckets = asyncio.create_task(bucket_setup.run())
+    yield
+
+    if not buckets.done():
+        buckets.cancel()
+    await event_broker.close()
+    await audit_writer.close()
+    await redis_client.aclose()
+    await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+
 
 app = FastAPI(
     title="File Storage API",
     description="REST API for file management with metadata extraction and role-based access",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+# Последний добавленный middleware внешний: отказы допуска загрузок (401/429/503) проходят через CORS
+app.add_middleware(UploadAdmissionMiddleware, prefix="/api/v1")
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -20,12 +55,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(file_storage_router, prefix="/api/v1")
+app.add_middleware(PrometheusMiddleware)
 
-@app.on_event("startup")
-async def startup_event():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+app.include_router(file_storage_router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
@@ -35,6 +67,19 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    checks = await check_readiness()
+    is_ready = all(result == "ok" for result in checks.values())
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "not ready", "checks": checks}
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
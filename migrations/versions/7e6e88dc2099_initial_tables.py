@@ -5,7 +5,7 @@ Revises:
 Create Date: 2025-09-04 19:24:54.416782
 
 """
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -14,12 +14,50 @@ down_revision = None
 branch_labels = None
 depends_on = None
 
+user_role = sa.Enum('USER', 'MANAGER', 'ADMIN', name='userrole')
+file_visibility = sa.Enum('PRIVATE', 'DEPARTMENT', 'PUBLIC', name='filevisibility')
+
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # До миграций таблицы создавал create_all при старте: в такой базе схема уже есть, её только помечаем ревизией
+    tables = [] if context.is_offline_mode() else sa.inspect(op.get_bind()).get_table_names()
+    if 'users' not in tables:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=50), nullable=False),
+            sa.Column('hashed_password', sa.String(length=255), nullable=False),
+            sa.Column('role', user_role, nullable=False),
+            sa.Column('department', sa.String(length=100), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+        op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    if 'files' not in tables:
+        op.create_table(
+            'files',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('original_filename', sa.String(length=255), nullable=False),
+            sa.Column('size', sa.BigInteger(), nullable=False),
+            sa.Column('content_type', sa.String(length=100), nullable=False),
+            sa.Column('visibility', file_visibility, nullable=False),
+            sa.Column('s3_path', sa.String(length=500), nullable=False),
+            sa.Column('owner_id', sa.Integer(), nullable=False),
+            sa.Column('department', sa.String(length=100), nullable=False),
+            sa.Column('download_count', sa.Integer(), nullable=True),
+            sa.Column('file_metadata', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_files_id'), 'files', ['id'], unique=False)
 
 def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ##
\ No newline at end of file
+    op.drop_index(op.f('ix_files_id'), table_name='files')
+    op.drop_table('files')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_table('users')
+    file_visibility.drop(op.get_bind(), checkfirst=True)
+    user_role.drop(op.get_bind(), checkfirst=True)
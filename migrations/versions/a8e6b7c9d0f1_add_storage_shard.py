@@ -0,0 +1,26 @@
+"""Add storage shard
+
+Revision ID: a8e6b7c9d0f1
+Revises: f7d5a6b8c9e0
+Create Date: 2026-10-19 17:12:03.551927
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a8e6b7c9d0f1'
+down_revision = 'f7d5a6b8c9e0'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('storage_shard', sa.String(length=50), nullable=False, server_default='default'))
+    # Сверка идёт по шардам, поэтому индекс по s3_path заменяется составным
+    op.create_index('ix_files_shard_s3_path', 'files', ['storage_shard', sa.text('s3_path COLLATE "C"')])
+    op.drop_index('ix_files_s3_path', table_name='files')
+
+def downgrade() -> None:
+    op.create_index('ix_files_s3_path', 'files', [sa.text('s3_path COLLATE "C"')])
+    op.drop_index('ix_files_shard_s3_path', table_name='files')
+    op.drop_column('files', 'storage_shard')
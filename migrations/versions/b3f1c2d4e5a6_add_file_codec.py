@@ -0,0 +1,21 @@
+"""Add file codec
+
+Revision ID: b3f1c2d4e5a6
+Revises: 7e6e88dc2099
+Create Date: 2026-10-19 10:12:31.204118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b3f1c2d4e5a6'
+down_revision = '7e6e88dc2099'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('codec', sa.String(length=20), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('files', 'codec')
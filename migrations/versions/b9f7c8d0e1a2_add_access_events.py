@@ -0,0 +1,32 @@
+"""Add access events
+
+Revision ID: b9f7c8d0e1a2
+Revises: a8e6b7c9d0f1
+Create Date: 2026-10-19 18:20:31.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b9f7c8d0e1a2'
+down_revision = 'a8e6b7c9d0f1'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Секции по месяцам создаются приложением по мере надобности
+    op.create_table(
+        'access_events',
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('file_id', sa.Integer(), nullable=False),
+        sa.Column('action', sa.String(length=20), nullable=False),
+        postgresql_partition_by='RANGE (occurred_at)'
+    )
+    op.create_index('ix_access_events_occurred_at', 'access_events', ['occurred_at'])
+    op.create_index('ix_access_events_file_id', 'access_events', ['file_id', 'occurred_at'])
+    op.create_index('ix_access_events_user_id', 'access_events', ['user_id', 'occurred_at'])
+
+def downgrade() -> None:
+    op.drop_table('access_events')
@@ -0,0 +1,63 @@
+"""Add file versions
+
+Revision ID: c0a8d9e1f2b3
+Revises: b9f7c8d0e1a2
+Create Date: 2026-10-19 21:12:07.530841
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c0a8d9e1f2b3'
+down_revision = 'b9f7c8d0e1a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'file_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('file_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('original_filename', sa.String(length=255), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('chunk_count', sa.Integer(), nullable=False),
+        sa.Column('new_chunks', sa.Integer(), nullable=False),
+        sa.Column('new_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['file_id'], ['files.id']),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('file_id', 'version', name='uq_file_versions_file_id_version')
+    )
+    op.create_index(op.f('ix_file_versions_id'), 'file_versions', ['id'], unique=False)
+    op.create_table(
+        'file_chunks',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('stored_size', sa.Integer(), nullable=False),
+        sa.Column('codec', sa.String(length=20), nullable=True),
+        sa.Column('storage_shard', sa.String(length=50), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('hash')
+    )
+    op.create_table(
+        'file_version_chunks',
+        sa.Column('version_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('chunk_hash', sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(['version_id'], ['file_versions.id']),
+        sa.PrimaryKeyConstraint('version_id', 'position')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('file_version_chunks')
+    op.drop_table('file_chunks')
+    op.drop_index(op.f('ix_file_versions_id'), table_name='file_versions')
+    op.drop_table('file_versions')
@@ -0,0 +1,29 @@
+"""Add storage tier
+
+Revision ID: c4a2d3e5f6b7
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-19 11:40:02.581937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c4a2d3e5f6b7'
+down_revision = 'b3f1c2d4e5a6'
+branch_labels = None
+depends_on = None
+
+storage_tier = sa.Enum('HOT', 'COLD', name='storagetier')
+
+def upgrade() -> None:
+    storage_tier.create(op.get_bind(), checkfirst=True)
+    op.add_column('files', sa.Column('storage_tier', storage_tier, nullable=False, server_default='HOT'))
+    op.add_column('files', sa.Column('last_accessed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_files_tier_last_access', 'files', ['storage_tier', 'last_accessed_at', 'id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_files_tier_last_access', table_name='files')
+    op.drop_column('files', 'last_accessed_at')
+    op.drop_column('files', 'storage_tier')
+    storage_tier.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,25 @@
+"""Index cold candidates by last access expression
+
+Revision ID: d1e9f0a2b3c4
+Revises: c0a8d9e1f2b3
+Create Date: 2026-10-20 10:05:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd1e9f0a2b3c4'
+down_revision = 'c0a8d9e1f2b3'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Кандидаты lifecycle отбираются по coalesce(last_accessed_at, created_at): индекс по голому столбцу его не обслуживал
+    op.drop_index('ix_files_tier_last_access', table_name='files')
+    op.create_index('ix_files_tier_last_access', 'files',
+                    ['storage_tier', sa.text('coalesce(last_accessed_at, created_at)'), 'id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_files_tier_last_access', table_name='files')
+    op.create_index('ix_files_tier_last_access', 'files', ['storage_tier', 'last_accessed_at', 'id'])
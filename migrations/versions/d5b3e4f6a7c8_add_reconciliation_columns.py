@@ -0,0 +1,23 @@
+"""Add reconciliation columns
+
+Revision ID: d5b3e4f6a7c8
+Revises: c4a2d3e5f6b7
+Create Date: 2026-10-19 13:05:47.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd5b3e4f6a7c8'
+down_revision = 'c4a2d3e5f6b7'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('missing_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_files_s3_path', 'files', [sa.text('s3_path COLLATE "C"')])
+
+def downgrade() -> None:
+    op.drop_index('ix_files_s3_path', table_name='files')
+    op.drop_column('files', 'missing_at')
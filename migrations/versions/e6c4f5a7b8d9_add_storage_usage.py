@@ -0,0 +1,43 @@
+"""Add storage usage
+
+Revision ID: e6c4f5a7b8d9
+Revises: d5b3e4f6a7c8
+Create Date: 2026-10-19 14:22:10.730561
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e6c4f5a7b8d9'
+down_revision = 'd5b3e4f6a7c8'
+branch_labels = None
+depends_on = None
+
+usage_scope = sa.Enum('USER', 'DEPARTMENT', name='usagescope')
+
+def upgrade() -> None:
+    op.create_table(
+        'storage_usage',
+        sa.Column('scope', usage_scope, nullable=False),
+        sa.Column('scope_id', sa.String(length=100), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=False),
+        sa.Column('bytes', sa.BigInteger(), nullable=False),
+        sa.Column('file_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('scope', 'scope_id', 'content_type')
+    )
+    # Первичное заполнение счётчиков из существующих файлов
+    op.execute("""
+        INSERT INTO storage_usage (scope, scope_id, content_type, bytes, file_count)
+        SELECT 'USER'::usagescope, owner_id::text, content_type, SUM(size), COUNT(*) FROM files GROUP BY owner_id, content_type
+        UNION ALL
+        SELECT 'USER'::usagescope, owner_id::text, '*', SUM(size), COUNT(*) FROM files GROUP BY owner_id
+        UNION ALL
+        SELECT 'DEPARTMENT'::usagescope, department, content_type, SUM(size), COUNT(*) FROM files GROUP BY department, content_type
+        UNION ALL
+        SELECT 'DEPARTMENT'::usagescope, department, '*', SUM(size), COUNT(*) FROM files GROUP BY department
+    """)
+
+def downgrade() -> None:
+    op.drop_table('storage_usage')
+    usage_scope.drop(op.get_bind(), checkfirst=True)
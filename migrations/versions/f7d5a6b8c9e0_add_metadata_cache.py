@@ -0,0 +1,31 @@
+"""Add metadata cache
+
+Revision ID: f7d5a6b8c9e0
+Revises: e6c4f5a7b8d9
+Create Date: 2026-10-19 16:05:42.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'f7d5a6b8c9e0'
+down_revision = 'e6c4f5a7b8d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'metadata_cache',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=False),
+        sa.Column('extractor_version', sa.Integer(), nullable=False),
+        sa.Column('file_metadata', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash', 'content_type', 'extractor_version')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('metadata_cache')
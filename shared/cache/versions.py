@@ -0,0 +1,50 @@
+import time
+from typing import Optional, Sequence
+from redis.exceptions import RedisError
+from shared.storage.redis_client import redis_client, sync_redis_client
+
+
+class CollectionVersions:
+    PREFIX = "collection-version:"
+    CHANGED_PREFIX = "collection-changed:"
+
+    async def get(self, scopes: Sequence[str]) -> Optional[str]:
+        try:
+            values = await redis_client.mget([self.PREFIX + scope for scope in scopes])
+        except RedisError:
+            return None
+        return ".".join((value or b"0").decode() for value in values)
+
+    async def changed_within(self, scopes: Sequence[str], seconds: float) -> bool:
+        # Без Redis изменение считается недавним: вызывающий выберет primary
+        try:
+            values = await redis_client.mget([self.CHANGED_PREFIX + scope for scope in scopes])
+        except RedisError:
+            return True
+        cutoff = time.time() - seconds
+        return any(value is not None and float(value) > cutoff for value in values)
+
+    async def bump(self, scopes: Sequence[str]) -> None:
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            for scope in scopes:
+                pipeline.incr(self.PREFIX + scope)
+                pipeline.set(self.CHANGED_PREFIX + scope, time.time())
+            await pipeline.execute()
+        except RedisError as e:
+            # Тег, выданный до изменения, останется действительным до следующего успешного увеличения версии;
+            # вызывающие увеличивают версии и до коммита, и после, чтобы одиночный сбой не закрепил старый ответ
+            print(f"Collection version bump failed: {e}")
+
+    def bump_sync(self, scopes: Sequence[str]) -> None:
+        try:
+            pipeline = sync_redis_client.pipeline(transaction=False)
+            for scope in scopes:
+                pipeline.incr(self.PREFIX + scope)
+                pipeline.set(self.CHANGED_PREFIX + scope, time.time())
+            pipeline.execute()
+        except RedisError as e:
+            print(f"Collection version bump failed: {e}")
+
+
+collection_versions = CollectionVersions()
@@ -1,12 +1,35 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from shared.metrics.db import instrument_engine
 from config.settings import settings
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.env == "local",
-    future=True
-)
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    options = {"echo": settings.env == "local", "future": True}
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle,
+            pool_timeout=settings.db_pool_timeout,
+            pool_pre_ping=settings.db_pool_pre_ping
+        )
+    return options
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    created = create_async_engine(url, **_engine_options(url))
+    instrument_engine(created)
+    return created
+
+
+engine = _create_engine(settings.database_url)
+replica_engines = [_create_engine(url) for url in settings.database_replica_urls]
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -14,9 +37,62 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
+# Отставание реплики считаем нулевым, если всё полученное WAL уже применено
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReadReplicaRouter:
+
+    def __init__(self, primary: AsyncEngine, replicas: List[AsyncEngine]):
+        # Чтения идут в AUTOCOMMIT: без BEGIN/COMMIT на каждый запрос
+        self._primary = self._session_factory(primary)
+        self._replicas = [(replica, self._session_factory(replica)) for replica in replicas]
+        self._health: Dict[int, tuple] = {}
+        self._order = itertools.cycle(range(len(replicas))) if replicas else None
+
+    async def session(self) -> AsyncSession:
+        for _ in range(len(self._replicas)):
+            index = next(self._order)
+            if await self._is_healthy(index):
+                return self._replicas[index][1]()
+        return self._primary()
+
+    async def _is_healthy(self, index: int) -> bool:
+        checked_at, healthy = self._health.get(index, (0.0, False))
+        if time.monotonic() - checked_at < settings.replica_check_interval:
+            return healthy
+
+        try:
+            healthy = await asyncio.wait_for(self._lag(index), settings.replica_check_timeout) <= settings.replica_max_lag
+        except Exception:
+            healthy = False
+        self._health[index] = (time.monotonic(), healthy)
+        return healthy
+
+    async def _lag(self, index: int) -> float:
+        async with self._replicas[index][0].connect() as connection:
+            return float((await connection.execute(REPLICA_LAG_QUERY)).scalar() or 0)
+
+    @staticmethod
+    def _session_factory(target: AsyncEngine):
+        return sessionmaker(
+            bind=target.execution_options(isolation_level="AUTOCOMMIT"),
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+
+
+read_router = ReadReplicaRouter(engine, replica_engines)
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
@@ -40,4 +40,14 @@ class SQLAlchemyUoW(AbstractUoW):
         await self.session.commit()
 
     async def rollback(self):
-        await self.session.rollback()
\ No newline at end of file
+        await self.session.rollback()
+
+
+class SQLAlchemyReadOnlyUoW(SQLAlchemyUoW):
+
+    async def __aenter__(self):
+        self.session = await self.session_factory()
+        return self
+
+    async def commit(self):
+        raise RuntimeError("Read-only unit of work cannot commit")
\ No newline at end of file
@@ -0,0 +1,24 @@
+import math
+from fastapi import HTTPException, status
+
+
+class RetryLaterException(HTTPException):
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+class TooManyRequests(RetryLaterException):
+
+    def __init__(self, retry_after: float, detail: str = "Too many requests"):
+        super().__init__(status.HTTP_429_TOO_MANY_REQUESTS, detail, retry_after)
+
+
+class ServiceOverloaded(RetryLaterException):
+
+    def __init__(self, retry_after: float, detail: str = "Server is busy, try again later"):
+        super().__init__(status.HTTP_503_SERVICE_UNAVAILABLE, detail, retry_after)
\ No newline at end of file
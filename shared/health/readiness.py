@@ -0,0 +1,61 @@
+import asyncio
+from typing import Dict, Optional
+from sqlalchemy import text
+from shared.db.connection import engine
+from shared.storage.sharding import object_storage
+from shared.storage.redis_client import redis_client
+from config.settings import settings
+
+
+class BucketSetup:
+
+    def __init__(self):
+        self.done = False
+        self.error: Optional[str] = None
+
+    async def run(self) -> None:
+        # MinIO может подняться позже API: создание бакетов повторяется с экспоненциальной задержкой
+        delay = 1.0
+        while True:
+            try:
+                await asyncio.to_thread(object_storage.ensure_buckets)
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                print(f"Bucket setup failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, settings.bucket_setup_max_backoff)
+                continue
+            self.done, self.error = True, None
+            return
+
+
+bucket_setup = BucketSetup()
+
+
+async def _check_database() -> None:
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def _check_redis() -> None:
+    await redis_client.ping()
+
+
+async def _check_storage() -> None:
+    if not bucket_setup.done:
+        raise RuntimeError(f"Bucket setup has not completed: {bucket_setup.error or 'pending'}")
+    missing = await asyncio.to_thread(object_storage.ping)
+    if missing:
+        raise RuntimeError(f"Buckets missing on shards: {', '.join(missing)}")
+
+
+async def check_readiness() -> Dict[str, str]:
+    checks = {"database": _check_database(), "redis": _check_redis(), "storage": _check_storage()}
+    results = await asyncio.gather(
+        *(asyncio.wait_for(check, timeout=settings.readiness_timeout) for check in checks.values()),
+        return_exceptions=True
+    )
+    return {
+        name: "ok" if not isinstance(result, BaseException) else f"error: {type(result).__name__}"
+        for name, result in zip(checks, results)
+    }
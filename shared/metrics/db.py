@@ -0,0 +1,49 @@
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from .registry import DB_QUERY_SECONDS, DB_QUERY_ERRORS
+
+current_operation: ContextVar[str] = ContextVar("current_operation", default="other")
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        DB_QUERY_SECONDS.labels(current_operation.get()).observe(time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+        DB_QUERY_ERRORS.labels(current_operation.get()).inc()
+
+
+# Запросы внутри публичных методов репозитория получают метку вида "FileRepository.get_by_id"
+def instrumented(cls):
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _bind_operation(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _bind_operation(operation: str, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = current_operation.set(operation)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+    return wrapper
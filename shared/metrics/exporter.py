@@ -0,0 +1,37 @@
+import os
+from typing import Sequence
+import redis
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+
+
+class QueueDepthCollector:
+
+    def __init__(self, redis_url: str, queues: Sequence[str], priority_steps: Sequence[int] = ()):
+        self.client = redis.Redis.from_url(redis_url, socket_timeout=1)
+        self.queues = queues
+        # Kombu хранит каждый уровень приоритета, кроме нулевого, в отдельном списке "<queue>:<step>"
+        self.suffixes = [""] + [f":{step}" for step in priority_steps if step]
+
+    def collect(self):
+        gauge = GaugeMetricFamily("worker_queue_depth", "Messages waiting in the broker queue", labels=["queue"])
+        for queue in self.queues:
+            try:
+                gauge.add_metric([queue], sum(self.client.llen(queue + suffix) for suffix in self.suffixes))
+            except redis.RedisError:
+                continue
+        yield gauge
+
+
+def start_worker_exporter(port: int, redis_url: str, queues: Sequence[str], priority_steps: Sequence[int] = ()) -> None:
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    registry.register(QueueDepthCollector(redis_url, queues, priority_steps))
+    start_http_server(port, registry=registry)
+
+
+def mark_process_dead(pid: int) -> None:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,41 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "handler", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method"], multiprocess_mode="livesum"
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "SQL statement latency", ["operation"]
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total", "Failed SQL statements", ["operation"]
+)
+
+STORAGE_OPERATION_SECONDS = Histogram(
+    "storage_operation_duration_seconds", "Object storage call latency", ["operation"]
+)
+STORAGE_OPERATION_ERRORS = Counter(
+    "storage_operation_errors_total", "Failed object storage calls", ["operation"]
+)
+STORAGE_BYTES = Counter(
+    "storage_bytes_total", "Bytes transferred to and from object storage", ["direction"]
+)
+
+AUTH_LOGINS = Counter(
+    "auth_logins_total", "Login attempts", ["result"]
+)
+
+WORKER_TASK_SECONDS = Histogram(
+    "worker_task_duration_seconds", "Celery task duration",
+    ["task", "state"], buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+METADATA_EXTRACTIONS = Counter(
+    "metadata_extractions_total", "Metadata extraction results", ["content_type", "result"]
+)
+
+AUDIT_EVENTS = Counter(
+    "audit_events_total", "Access audit events by outcome", ["result"]
+)
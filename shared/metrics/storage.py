@@ -0,0 +1,19 @@
+import functools
+import time
+from .registry import STORAGE_OPERATION_SECONDS, STORAGE_OPERATION_ERRORS
+
+
+def timed_storage(operation: str):
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            except Exception:
+                STORAGE_OPERATION_ERRORS.labels(operation).inc()
+                raise
+            finally:
+                STORAGE_OPERATION_SECONDS.labels(operation).observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
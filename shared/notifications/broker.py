@@ -0,0 +1,85 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Set, Tuple
+from redis.exceptions import RedisError
+from shared.storage.redis_client import redis_client, sync_redis_client
+from config.settings import settings
+
+
+class EventBroker:
+    CHANNEL = "file-events"
+    POLL_TIMEOUT = 1.0
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self):
+        self._subscribers: Set[Tuple[frozenset, asyncio.Queue]] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, event: str, scopes: Sequence[str], payload: Dict[str, Any]) -> None:
+        try:
+            await redis_client.publish(self.CHANNEL, self._encode(event, scopes, payload))
+        except RedisError:
+            # Уведомления best effort: клиент всё равно сверится со списком через ETag
+            pass
+
+    def publish_sync(self, event: str, scopes: Sequence[str], payload: Dict[str, Any]) -> None:
+        try:
+            sync_redis_client.publish(self.CHANNEL, self._encode(event, scopes, payload))
+        except RedisError:
+            pass
+
+    @asynccontextmanager
+    async def subscribe(self, scopes: Sequence[str]) -> AsyncIterator[asyncio.Queue]:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+        subscriber = (frozenset(scopes), asyncio.Queue(maxsize=settings.notification_queue_size))
+        self._subscribers.add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            self._subscribers.discard(subscriber)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    async def _listen(self) -> None:
+        # Одна подписка Redis на процесс, события раздаются по локальным очередям клиентов
+        while True:
+            try:
+                async with redis_client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    while True:
+                        message = await pubsub.get_message(timeout=self.POLL_TIMEOUT)
+                        if message is not None:
+                            self._dispatch(message["data"])
+            except RedisError:
+                await asyncio.sleep(self.RECONNECT_DELAY)
+
+    def _dispatch(self, data: bytes) -> None:
+        # Битое сообщение в канале пропускается: исключение здесь остановило бы раздачу всем клиентам
+        try:
+            message = json.loads(data)
+            scopes = set(message.pop("scopes"))
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            print(f"Skipping malformed file event: {e}")
+            return
+        for reader_scopes, queue in list(self._subscribers):
+            if reader_scopes & scopes:
+                try:
+                    queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    # Медленный клиент теряет события, но не задерживает остальных
+                    pass
+
+    @staticmethod
+    def _encode(event: str, scopes: Sequence[str], payload: Dict[str, Any]) -> str:
+        return json.dumps({"event": event, "scopes": list(scopes), **payload}, default=str)
+
+
+event_broker = EventBroker()
@@ -0,0 +1,107 @@
+import hashlib
+import io
+import itertools
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from shared.storage.compression import compressor
+from shared.storage.sharding import ShardedStorage, object_storage
+from config.settings import settings
+
+
+@dataclass(slots=True)
+class Chunk:
+    hash: str
+    offset: int
+    size: int
+
+
+@dataclass(slots=True)
+class StoredChunk:
+    storage_shard: str
+    stored_size: int
+    codec: Optional[str]
+
+
+class ChunkStore:
+
+    def __init__(self, storage: ShardedStorage):
+        self.storage = storage
+        self._executor = ThreadPoolExecutor(max_workers=settings.chunk_transfer_workers, thread_name_prefix="chunks")
+
+    @staticmethod
+    def path(chunk_hash: str) -> str:
+        return f"{chunk_hash[:2]}/{chunk_hash}"
+
+    def split(self, stream: BinaryIO) -> Tuple[List[Chunk], str]:
+        # fastcdc тянет click при импорте, поэтому загружается только при первой версии
+        from fastcdc import fastcdc
+
+        stream.seek(0)
+        digest = hashlib.sha256()
+        chunks = []
+        for chunk in fastcdc(stream, settings.chunk_min_size, settings.chunk_avg_size, settings.chunk_max_size,
+                             fat=True, hf=hashlib.sha256):
+            digest.update(chunk.data)
+            chunks.append(Chunk(chunk.hash, chunk.offset, chunk.length))
+        stream.seek(0)
+        return chunks, digest.hexdigest()
+
+    def upload(self, stream: BinaryIO, chunks: Sequence[Chunk], content_type: str) -> Dict[str, StoredChunk]:
+        # Поток читается последовательно в этом потоке, а в MinIO чанки уходят параллельно;
+        # число чанков в полёте ограничено, чтобы версия не оказывалась в памяти целиком
+        pending: Deque[Tuple[str, Future]] = deque()
+        stored: Dict[str, StoredChunk] = {}
+        for chunk in chunks:
+            stream.seek(chunk.offset)
+            data = stream.read(chunk.size)
+            pending.append((chunk.hash, self._executor.submit(self._put, chunk.hash, data, content_type)))
+            if len(pending) >= settings.chunk_transfer_workers * 2:
+                chunk_hash, future = pending.popleft()
+                stored[chunk_hash] = future.result()
+        for chunk_hash, future in pending:
+            stored[chunk_hash] = future.result()
+        stream.seek(0)
+        return stored
+
+    def iter_content(self, chunks: Iterable[Tuple[str, str, Optional[str]]]) -> Iterator[bytes]:
+        # Следующие chunk_prefetch чанков скачиваются заранее, пока отдаётся текущий
+        chunks = iter(chunks)
+        pending: Deque[Future] = deque(
+            self._executor.submit(self._get, *chunk) for chunk in itertools.islice(chunks, settings.chunk_prefetch)
+        )
+        try:
+            while pending:
+                data = pending.popleft().result()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(self._executor.submit(self._get, *chunk))
+                yield data
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _put(self, chunk_hash: str, data: bytes, content_type: str) -> StoredChunk:
+        path = self.path(chunk_hash)
+        shard = self.storage.shard_for(path)
+        storage = self.storage.client(shard)
+        payload, stored_size, codec = compressor.compress(io.BytesIO(data), len(data), content_type)
+        try:
+            storage.upload_file(path, payload, content_type, stored_size, storage.chunk_bucket)
+        finally:
+            payload.close()
+        return StoredChunk(shard, stored_size, codec)
+
+    def _get(self, chunk_hash: str, shard: str, codec: Optional[str]) -> bytes:
+        storage = self.storage.client(shard)
+        response = storage.download_file(self.path(chunk_hash), storage.chunk_bucket)
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        return compressor.decompress(data, codec)
+
+
+chunk_store = ChunkStore(object_storage)
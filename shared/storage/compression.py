@@ -0,0 +1,95 @@
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+import zstandard
+from config.settings import settings
+
+ZSTD = "zstd"
+
+
+class Compressor:
+    SAMPLE_SIZE = 64 * 1024
+    CHUNK_SIZE = 64 * 1024
+    SPOOL_SIZE = 8 * 1024 * 1024
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def compress(self, data: BinaryIO, size: int, content_type: str,
+                 level: Optional[int] = None) -> Tuple[BinaryIO, int, Optional[str]]:
+        if level is None and not settings.compression_enabled:
+            return data, size, None
+        if size < settings.compression_min_size:
+            return data, size, None
+
+        started = time.process_time()
+        cctx = zstandard.ZstdCompressor(level=level or settings.compression_level)
+
+        # Пробуем сжать начало файла, чтобы не тратить CPU на несжимаемые данные
+        sample = data.read(self.SAMPLE_SIZE)
+        data.seek(0)
+        if len(cctx.compress(sample)) > len(sample) * settings.compression_min_ratio:
+            self._record(content_type, size, size, time.process_time() - started, None)
+            return data, size, None
+
+        compressed = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE)
+        _, written = cctx.copy_stream(data, compressed, size=size)
+
+        if written > size * settings.compression_min_ratio:
+            compressed.close()
+            data.seek(0)
+            self._record(content_type, size, size, time.process_time() - started, None)
+            return data, size, None
+
+        compressed.seek(0)
+        self._record(content_type, size, written, time.process_time() - started, ZSTD)
+        return compressed, written, ZSTD
+
+    def iter_decompressed(self, raw, codec: Optional[str]) -> Iterator[bytes]:
+        reader = zstandard.ZstdDecompressor().stream_reader(raw) if codec == ZSTD else raw
+        try:
+            while chunk := reader.read(self.CHUNK_SIZE):
+                yield chunk
+        finally:
+            if reader is not raw:
+                reader.close()
+            # Ответ MinIO нужно не только закрыть, но и вернуть соединение в пул
+            raw.close()
+            raw.release_conn()
+
+    def decompress(self, data: bytes, codec: Optional[str]) -> bytes:
+        if codec == ZSTD:
+            return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        return data
+
+    def get_stats(self) -> List[Dict[str, float]]:
+        # Статистика копится в памяти процесса: у каждого воркера API своя, после перезапуска она обнуляется
+        with self._lock:
+            return [
+                {
+                    "content_type": content_type,
+                    **stats,
+                    "ratio": stats["stored_bytes"] / stats["original_bytes"] if stats["original_bytes"] else 1.0
+                }
+                for content_type, stats in sorted(self._stats.items())
+            ]
+
+    def _record(self, content_type: str, original: int, stored: int, cpu_seconds: float, codec: Optional[str]):
+        with self._lock:
+            stats = self._stats.setdefault(content_type, {
+                "files": 0,
+                "compressed_files": 0,
+                "original_bytes": 0,
+                "stored_bytes": 0,
+                "cpu_seconds": 0.0
+            })
+            stats["files"] += 1
+            stats["compressed_files"] += 1 if codec else 0
+            stats["original_bytes"] += original
+            stats["stored_bytes"] += stored
+            stats["cpu_seconds"] += cpu_seconds
+
+
+compressor = Compressor()
@@ -1,49 +1,118 @@
+import threading
+from typing import Iterable, Optional
 from minio import Minio
+from minio.commonconfig import CopySource
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
+from shared.metrics.registry import STORAGE_BYTES
+from shared.metrics.storage import timed_storage
 from config.settings import settings
 
 
 class MinioClient:
 
-    def __init__(self):
-        self.client = Minio(
-            settings.minio_endpoint,
-            access_key=settings.minio_access_key,
-            secret_key=settings.minio_secret_key,
-            secure=False
-        )
-        self._ensure_bucket()
+    def __init__(self, endpoint: Optional[str] = None, access_key: Optional[str] = None,
+                 secret_key: Optional[str] = None, bucket: Optional[str] = None,
+                 cold_bucket: Optional[str] = None, chunk_bucket: Optional[str] = None, secure: bool = False):
+        self.endpoint = endpoint or settings.minio_endpoint
+        self.access_key = access_key or settings.minio_access_key
+        self.secret_key = secret_key or settings.minio_secret_key
+        self.bucket = bucket or settings.minio_bucket
+        self.cold_bucket = cold_bucket or settings.minio_cold_bucket
+        self.chunk_bucket = chunk_bucket or settings.minio_chunk_bucket
+        self.secure = secure
+        self._client: Optional[Minio] = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Minio:
+        # Клиент создаётся при первом обращении: импорт модуля не должен зависеть от MinIO
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = Minio(
+                        self.endpoint,
+                        access_key=self.access_key,
+                        secret_key=self.secret_key,
+                        secure=self.secure
+                    )
+        return self._client
+
+    def ensure_buckets(self):
+        self._ensure_bucket(self.bucket)
+        self._ensure_bucket(self.cold_bucket)
+        self._ensure_bucket(self.chunk_bucket)
+
+    def ping(self) -> bool:
+        return self.client.bucket_exists(self.bucket)
 
-    def _ensure_bucket(self):
+    def _ensure_bucket(self, bucket: str):
         try:
-            if not self.client.bucket_exists(settings.minio_bucket):
-                self.client.make_bucket(settings.minio_bucket)
+            if not self.client.bucket_exists(bucket):
+                self.client.make_bucket(bucket)
         except S3Error as e:
-            print(f"Error creating bucket: {e}")
+            # Бакет мог создать соседний процесс между проверкой и созданием
+            if e.code not in ("BucketAlreadyOwnedByYou", "BucketAlreadyExists"):
+                raise
 
-    def upload_file(self, file_path: str, file_data, content_type: str, size: int):
+    @timed_storage("upload")
+    def upload_file(self, file_path: str, file_data, content_type: str, size: int, bucket: Optional[str] = None):
         try:
             self.client.put_object(
-                settings.minio_bucket,
+                bucket or self.bucket,
                 file_path,
                 file_data,
                 size,
                 content_type=content_type
             )
+            STORAGE_BYTES.labels("upload").inc(size)
         except S3Error as e:
             raise Exception(f"Upload failed: {e}")
 
-    def download_file(self, file_path: str):
+    @timed_storage("download")
+    def download_file(self, file_path: str, bucket: Optional[str] = None):
         try:
-            return self.client.get_object(settings.minio_bucket, file_path)
+            response = self.client.get_object(bucket or self.bucket, file_path)
+            STORAGE_BYTES.labels("download").inc(int(response.headers.get("Content-Length", 0)))
+            return response
         except S3Error as e:
             raise Exception(f"Download failed: {e}")
 
-    def delete_file(self, file_path: str):
+    @timed_storage("copy")
+    def copy_file(self, source_path: str, target_path: str, source_bucket: str, target_bucket: str):
+        try:
+            self.client.copy_object(target_bucket, target_path, CopySource(source_bucket, source_path))
+        except S3Error as e:
+            raise Exception(f"Copy failed: {e}")
+
+    @timed_storage("delete")
+    def delete_file(self, file_path: str, bucket: Optional[str] = None):
         try:
-            self.client.remove_object(settings.minio_bucket, file_path)
+            self.client.remove_object(bucket or self.bucket, file_path)
         except S3Error:
             pass
 
+    @timed_storage("delete_batch")
+    def delete_files(self, file_paths: Iterable[str], bucket: Optional[str] = None):
+        errors = self.client.remove_objects(
+            bucket or self.bucket,
+            (DeleteObject(file_path) for file_path in file_paths)
+        )
+        for error in errors:
+            print(f"Error deleting object: {error}")
+
+    @timed_storage("stat")
+    def file_exists(self, file_path: str, bucket: Optional[str] = None) -> bool:
+        try:
+            self.client.stat_object(bucket or self.bucket, file_path)
+            return True
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise
+
+    def list_files(self, bucket: Optional[str] = None):
+        return self.client.list_objects(bucket or self.bucket, recursive=True)
+
 
-minio_client = MinioClient()
\ No newline at end of file
+minio_client = MinioClient()
@@ -0,0 +1,16 @@
+import redis
+import redis.asyncio as async_redis
+from config.settings import settings
+
+redis_client = async_redis.from_url(
+    settings.redis_url,
+    socket_connect_timeout=settings.redis_socket_timeout,
+    socket_timeout=settings.redis_socket_timeout
+)
+
+# Для Celery: каждая задача запускает свой цикл событий, асинхронный клиент между ними не переиспользовать
+sync_redis_client = redis.Redis.from_url(
+    settings.redis_url,
+    socket_connect_timeout=settings.redis_socket_timeout,
+    socket_timeout=settings.redis_socket_timeout
+)
@@ -0,0 +1,65 @@
+import bisect
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence
+from shared.storage.minio_client import MinioClient, minio_client
+from config.settings import settings
+
+DEFAULT_SHARD = "default"
+
+
+class HashRing:
+
+    def __init__(self, weights: Dict[str, int], vnodes: int):
+        points = []
+        for name, weight in weights.items():
+            for replica in range(max(1, weight) * vnodes):
+                points.append((self._hash(f"{name}#{replica}"), name))
+        points.sort()
+        self._keys = [point for point, _ in points]
+        self._nodes = [name for _, name in points]
+
+    def get(self, key: str) -> str:
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._nodes[index]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ShardedStorage:
+
+    def __init__(self, shards: Sequence[Dict[str, Any]]):
+        # Шард "default" из MINIO_* есть всегда: на нём лежат объекты, созданные до шардирования
+        self.clients: Dict[str, MinioClient] = {DEFAULT_SHARD: minio_client}
+        weights: Dict[str, int] = {}
+        for shard in shards:
+            name = shard["name"]
+            self.clients[name] = MinioClient(
+                endpoint=shard.get("endpoint"),
+                access_key=shard.get("access_key"),
+                secret_key=shard.get("secret_key"),
+                bucket=shard.get("bucket"),
+                cold_bucket=shard.get("cold_bucket"),
+                chunk_bucket=shard.get("chunk_bucket"),
+                secure=shard.get("secure", False)
+            )
+            if shard.get("writable", True):
+                weights[name] = int(shard.get("weight", 1))
+        self.ring = HashRing(weights or {DEFAULT_SHARD: 1}, settings.minio_shard_vnodes)
+
+    def shard_for(self, s3_path: str) -> str:
+        return self.ring.get(s3_path)
+
+    def client(self, shard: Optional[str] = None) -> MinioClient:
+        return self.clients[shard or DEFAULT_SHARD]
+
+    def ensure_buckets(self) -> None:
+        for client in self.clients.values():
+            client.ensure_buckets()
+
+    def ping(self) -> List[str]:
+        return [name for name, client in self.clients.items() if not client.ping()]
+
+
+object_storage = ShardedStorage(settings.minio_shards)
@@ -0,0 +1,63 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable
+from starlette.concurrency import iterate_in_threadpool
+from shared.exceptions.http import ServiceOverloaded
+from config.settings import settings
+
+
+class ConcurrencyGovernor:
+
+    def __init__(self, limits: Dict[str, int], max_waiting: int, queue_timeout: float):
+        self.limits = limits
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self._semaphores = {kind: asyncio.Semaphore(limit) for kind, limit in limits.items()}
+        self._waiting = {kind: 0 for kind in limits}
+
+    async def acquire(self, kind: str) -> None:
+        semaphore = self._semaphores[kind]
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return
+
+        if self._waiting[kind] >= self.max_waiting:
+            raise ServiceOverloaded(self.queue_timeout)
+
+        self._waiting[kind] += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ServiceOverloaded(self.queue_timeout)
+        finally:
+            self._waiting[kind] -= 1
+
+    async def release(self, kind: str) -> None:
+        self._semaphores[kind].release()
+
+    async def release_after(self, kind: str, stream: Iterable[bytes]) -> AsyncIterator[bytes]:
+        # background у StreamingResponse выполняется только после успешной отдачи,
+        # поэтому слот освобождается здесь: и при обрыве хранилища, и при отключении клиента
+        try:
+            async for chunk in iterate_in_threadpool(iter(stream)):
+                yield chunk
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+            await self.release(kind)
+
+    @asynccontextmanager
+    async def slot(self, kind: str):
+        await self.acquire(kind)
+        try:
+            yield
+        finally:
+            await self.release(kind)
+
+
+governor = ConcurrencyGovernor(
+    {"upload": settings.max_concurrent_uploads, "download": settings.max_concurrent_downloads},
+    settings.max_waiting_transfers,
+    settings.transfer_queue_timeout
+)
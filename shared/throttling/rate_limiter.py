@@ -0,0 +1,63 @@
+import threading
+import time
+from typing import Dict, Tuple
+from redis.exceptions import RedisError
+from shared.storage.redis_client import redis_client
+
+# Token bucket: пополнение и списание выполняются атомарно на стороне Redis
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RateLimiter:
+    REDIS_RETRY_INTERVAL = 5.0
+
+    def __init__(self):
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._local: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._redis_down_until = 0.0
+
+    async def hit(self, key: str, per_minute: float, burst: int, cost: int = 1) -> float:
+        rate = per_minute / 60
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                return float(await self._script(keys=[f"rate:{key}"], args=[rate, burst, cost]))
+            except RedisError:
+                # Redis недоступен: временно считаем лимиты в памяти процесса
+                self._redis_down_until = time.monotonic() + self.REDIS_RETRY_INTERVAL
+        return self._hit_local(key, rate, burst, cost)
+
+    def _hit_local(self, key: str, rate: float, burst: int, cost: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._local.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            retry_after = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                retry_after = (cost - tokens) / rate
+            self._local[key] = (tokens, now)
+            return retry_after
+
+
+rate_limiter = RateLimiter()